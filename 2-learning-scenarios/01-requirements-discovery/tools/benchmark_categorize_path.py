@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for EcosystemCategorizer.categorize_path
+
+Compares the precompiled keyword matcher against the original nested
+category/keyword loop on synthetic path sets, and checks that both
+return identical categories. When pandas is installed, the vectorized
+categorize_paths bulk API is timed and checked as well.
+
+Usage:
+    python benchmark_categorize_path.py                  # 10k, 100k, 1M paths
+    python benchmark_categorize_path.py --sizes 10000 50000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from ecosystem_categorizer import EcosystemCategorizer
+
+# Vocabulary mixing keyword hits with neutral names, similar to cookbook paths
+PATH_WORDS = [
+    "skills", "misc", "notebooks", "data", "utils", "examples", "tool_use",
+    "vision", "helpers", "summarization", "agents", "evaluation", "text_to_sql",
+    "contextual-embeddings", "Anthropic 1P", "sql", "images", "batch",
+]
+SUFFIXES = [".md", ".py", ".ipynb", ".txt"]
+
+
+def generate_paths(count: int, seed: int = 42) -> List[str]:
+    """Generate synthetic relative paths of 1-4 directories plus a file name"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        depth = rng.randint(1, 4)
+        dirs = "/".join(rng.choice(PATH_WORDS) for _ in range(depth))
+        paths.append(f"{dirs}/{i:07d}_{rng.choice(PATH_WORDS)}{rng.choice(SUFFIXES)}")
+    return paths
+
+
+def legacy_categorize_path(categories: Dict, file_path: str) -> str:
+    """Reference implementation: the original per-category keyword loop"""
+    path_lower = file_path.lower()
+    for category, info in categories.items():
+        for keyword in info["keywords"]:
+            if keyword in path_lower:
+                return category
+    return "general_utilities"
+
+
+def time_call(func, paths: List[str]):
+    """Return (seconds, results) for classifying every path with func"""
+    start = time.perf_counter()
+    results = [func(path) for path in paths]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark categorize_path against the legacy loop")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Number of synthetic paths per run")
+    args = parser.parse_args()
+
+    categorizer = EcosystemCategorizer(api_key="benchmark")
+    categories = categorizer.categories
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+        print("ℹ️  pandas not installed, skipping categorize_paths bulk timings")
+
+    print("⏱️  categorize_path micro-benchmark")
+    print("=" * 72)
+    print(f"{'paths':>10} {'legacy (s)':>12} {'indexed (s)':>12} {'speedup':>9}"
+          + (f" {'bulk (s)':>10} {'speedup':>9}" if pd else ""))
+
+    for size in args.sizes:
+        paths = generate_paths(size)
+        legacy_time, legacy_results = time_call(
+            lambda p: legacy_categorize_path(categories, p), paths)
+        indexed_time, indexed_results = time_call(categorizer.categorize_path, paths)
+
+        if legacy_results != indexed_results:
+            raise SystemExit(f"❌ Results differ from legacy loop at {size} paths")
+
+        speedup = legacy_time / indexed_time if indexed_time else float("inf")
+        row = f"{size:>10} {legacy_time:>12.3f} {indexed_time:>12.3f} {speedup:>8.2f}x"
+
+        if pd:
+            series = pd.Series(paths)
+            start = time.perf_counter()
+            bulk_results, _ = categorizer.categorize_paths(series)
+            bulk_time = time.perf_counter() - start
+            if bulk_results.tolist() != legacy_results:
+                raise SystemExit(f"❌ categorize_paths differs from legacy loop at {size} paths")
+            bulk_speedup = legacy_time / bulk_time if bulk_time else float("inf")
+            row += f" {bulk_time:>10.3f} {bulk_speedup:>8.2f}x"
+
+        print(row)
+
+    print("\n✅ Indexed" + (" and bulk" if pd else "") + " results identical to legacy loop")
+
+
+if __name__ == "__main__":
+    main()
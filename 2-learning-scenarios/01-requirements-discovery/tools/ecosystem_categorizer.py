@@ -9,15 +9,432 @@ the ecosystem organization.
 """
 
 import os
+import re
 import json
+import time
+import random
+import asyncio
+import hashlib
+import sqlite3
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Set, Tuple
 import anthropic
 
+from path_store import CompactPathStore, to_plain
+
+SCAN_SUFFIXES = ('.md', '.py', '.ipynb', '.txt')
+SECTION_SUFFIXES = ('.ipynb', '.md', '.py')
+COOKBOOK_SECTIONS = ['skills', 'tool_use', 'multimodal', 'misc', 'third_party']
+MANIFEST_VERSION = 2
+
+DEFAULT_MODEL = "claude-3-haiku-20240307"
+CONTENT_EXCERPT_CHARS = 2000
+
+PROMPT_TEMPLATE = """
+        Analyze this file and categorize it based on what user problem it solves:
+
+        File: {file_path}
+        Content: {content}
+
+        Categories:
+        - developer_onboarding: Learning materials and educational content
+        - integration_tools: Tools for integrating Claude with external systems  
+        - production_patterns: Production-ready patterns and best practices
+        - multimodal_capabilities: Vision and document processing features
+        - automation_workflows: Tools for automating complex business processes
+        - quality_assurance: Testing, evaluation, and quality measurement tools
+
+        Respond with just the category name.
+        """
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` requests per second, bursting to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CategorizationCache:
+    """Persistent SQLite cache of Claude categorizations with LRU eviction.
+    
+    Entries are keyed by a hash of the model name and the fully rendered
+    prompt (template, file path and content), i.e. exactly what is sent to
+    the API. An unchanged file never needs another API call, files with the
+    same content at different paths are asked about separately, and a new
+    model or prompt invalidates everything automatically.
+    
+    Cache hits only record their LRU timestamp in memory; the timestamps
+    are written in one transaction every TOUCH_BATCH hits, with the next
+    put(), and on flush() or close(). The entry count is kept in memory,
+    and once it goes past max_entries the least recently used entries are
+    evicted down to EVICTION_FILL of the limit in one batch.
+    """
+    
+    TOUCH_BATCH = 256
+    EVICTION_FILL = 0.9
+    
+    def __init__(self, db_path: str, max_entries: int = 100_000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        # key -> last_used of hits not yet written
+        self._touches = {}
+        
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS categorizations ("
+            "key TEXT PRIMARY KEY, category TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_categorizations_last_used ON categorizations (last_used)"
+        )
+        self._conn.commit()
+        self._entries = self._count()
+    
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        """Hash the model and the rendered prompt into a cache key"""
+        digest = hashlib.sha256()
+        for part in (model, prompt):
+            digest.update(part.encode('utf-8', errors='surrogatepass'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM categorizations").fetchone()[0]
+    
+    def _write_touches(self):
+        """Write the buffered LRU timestamps (the caller commits)"""
+        if self._touches:
+            self._conn.executemany(
+                "UPDATE categorizations SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touches.items()]
+            )
+            self._touches.clear()
+    
+    def _evict(self):
+        """Drop the least recently used entries down to EVICTION_FILL of max_entries"""
+        self._write_touches()
+        excess = self._entries - int(self.max_entries * self.EVICTION_FILL)
+        self._conn.execute(
+            "DELETE FROM categorizations WHERE key IN "
+            "(SELECT key FROM categorizations ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        # Recounted in case another process shares the database
+        self._entries = self._count()
+        self.stats["evictions"] += excess
+    
+    def get(self, key: str):
+        """Return the cached category, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category FROM categorizations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._touches[key] = time.time()
+            if len(self._touches) >= self.TOUCH_BATCH:
+                self._write_touches()
+                self._conn.commit()
+            self.stats["hits"] += 1
+            return row[0]
+    
+    def put(self, key: str, category: str):
+        """Store a category, evicting least recently used entries once over the limit"""
+        with self._lock:
+            now = time.time()
+            self._touches.pop(key, None)
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO categorizations (key, category, last_used) VALUES (?, ?, ?)",
+                (key, category, now)
+            ).rowcount
+            if inserted:
+                self._entries += 1
+            else:
+                self._conn.execute(
+                    "UPDATE categorizations SET category = ?, last_used = ? WHERE key = ?",
+                    (category, now, key)
+                )
+            self.stats["stores"] += 1
+            if self._entries > self.max_entries:
+                self._evict()
+            self._write_touches()
+            self._conn.commit()
+    
+    def flush(self):
+        """Write buffered LRU timestamps now"""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+    
+    def report(self) -> Dict:
+        """Hit/miss statistics for this session plus the current entry count"""
+        with self._lock:
+            entries = self._count()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": entries,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+    
+    def close(self):
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+def build_coverage_metrics(total_files: int, categorized_files: int) -> Dict:
+    """Build the coverage_metrics dict from file counts (80% coverage goal)"""
+    coverage_percent = (categorized_files / total_files * 100) if total_files > 0 else 0
+    
+    return {
+        "total_files_analyzed": total_files,
+        "categorized_files": categorized_files,
+        "coverage_percentage": round(coverage_percent, 1),
+        "meets_80_percent_goal": coverage_percent >= 80.0
+    }
+
+
+class CoverageTracker:
+    """Running coverage counters, updated as each entry is categorized.
+    
+    Counts entries per category and per section (cookbook section name, or
+    "courses"), so coverage is known the moment a scan ends and can be
+    watched while it runs. progress_callback, if given, receives snapshot()
+    every progress_every entries. Safe to update from scanning threads.
+    """
+    
+    def __init__(self, progress_callback=None, progress_every: int = 1000):
+        self.progress_callback = progress_callback
+        self.progress_every = progress_every
+        self.total_files = 0
+        self.categorized_files = 0
+        self.by_category = defaultdict(int)
+        self.by_section = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def record(self, category: str, section: str):
+        """Count one categorized entry"""
+        with self._lock:
+            self.total_files += 1
+            if category != "general_utilities":
+                self.categorized_files += 1
+            self.by_category[category] += 1
+            self.by_section[section] += 1
+            report_progress = self.progress_callback and self.total_files % self.progress_every == 0
+            snapshot = self._snapshot() if report_progress else None
+        if snapshot:
+            self.progress_callback(snapshot)
+    
+    def metrics(self) -> Dict:
+        """Current coverage_metrics, in the report format"""
+        with self._lock:
+            return build_coverage_metrics(self.total_files, self.categorized_files)
+    
+    def snapshot(self) -> Dict:
+        """Coverage metrics plus per-category and per-section counts"""
+        with self._lock:
+            return self._snapshot()
+    
+    def _snapshot(self) -> Dict:
+        return {
+            **build_coverage_metrics(self.total_files, self.categorized_files),
+            "by_category": dict(self.by_category),
+            "by_section": dict(self.by_section)
+        }
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits (429), server errors (5xx) and connection problems are retried"""
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, anthropic.APIConnectionError)
+
+
+def _retry_delay(error: Exception, attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter, never shorter than a Retry-After header"""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+
+def _list_directory(dir_path: str) -> Tuple[List[str], List[str]]:
+    """Return (file names, subdirectory paths) of one directory via os.scandir.
+    
+    Uses the dirent type information, so regular entries are not stat-ed
+    again. Symlinked directories are not descended into, matching rglob.
+    """
+    files, subdirs = [], []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def walk_files(base_path: str, suffixes: Tuple[str, ...], max_workers: int = 1) -> List[str]:
+    """List files under base_path with a matching suffix, relative to base_path.
+    
+    Directories are scanned level by level; with max_workers > 1 each level's
+    directories are listed in parallel threads. Output order is deterministic
+    for a given tree regardless of the worker count.
+    """
+    return list(iter_walk_files(base_path, suffixes, max_workers))
+
+
+def iter_walk_files(base_path: str, suffixes: Tuple[str, ...], max_workers: int = 1) -> Iterator[str]:
+    """Generator version of walk_files, yielding paths as each level is listed"""
+    base = os.fspath(base_path)
+    relative_start = len(os.path.join(base, ''))
+    level = [base]
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        while level:
+            listings = executor.map(_list_directory, level) if executor else map(_list_directory, level)
+            next_level = []
+            for dir_path, (files, subdirs) in zip(level, listings):
+                prefix = os.path.join(dir_path, '')[relative_start:]
+                for name in files:
+                    if os.path.splitext(name)[1] in suffixes:
+                        yield prefix + name
+                next_level.extend(subdirs)
+            level = next_level
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def load_ndjson_report(ndjson_file: str) -> Dict:
+    """Rebuild the nested JSON report from a stream written by stream_report.
+    
+    If the stream has no summary record (the run stopped early), coverage
+    metrics are computed from the entries that were written.
+    """
+    report = None
+    total_files = 0
+    categorized_files = 0
+    with open(ndjson_file, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record["type"]
+            if kind == "header":
+                report = {
+                    "summary": record["summary"],
+                    "category_definitions": record["category_definitions"],
+                    "cookbook_analysis": {},
+                    "courses_analysis": {},
+                    "coverage_metrics": {}
+                }
+            elif kind == "section":
+                report["cookbook_analysis"].setdefault(record["section"], {})
+            elif kind == "entry":
+                if record["source"] == "cookbook":
+                    analysis = report["cookbook_analysis"].setdefault(record["section"], {})
+                else:
+                    analysis = report["courses_analysis"]
+                analysis.setdefault(record["category"], []).append(record["path"])
+                total_files += 1
+                if record["category"] != "general_utilities":
+                    categorized_files += 1
+            elif kind == "summary":
+                report["coverage_metrics"] = record["coverage_metrics"]
+    
+    if report is None:
+        raise ValueError(f"{ndjson_file} has no header record")
+    if not report["coverage_metrics"]:
+        report["coverage_metrics"] = build_coverage_metrics(total_files, categorized_files)
+    return report
+
+
+def _prefix_alternation(words) -> str:
+    """Regex matching any of words, with shared prefixes factored out.
+    
+    ``course|client|classification`` becomes ``c(?:l(?:assification|ient)|ourse)``,
+    so the regex engine tries one branch per distinct first character at
+    each position instead of one per word. Longer words are preferred
+    where one word is a prefix of another.
+    
+    >>> _prefix_alternation(["api", "agent", "ag"])
+    'a(?:g(?:ent)?|pi)'
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def branch(node):
+        alternatives = [re.escape(char) + branch(child) for char, child in sorted(node.items()) if char]
+        # A word ending here makes the rest optional (greedy: longest match)
+        optional = "" in node
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")" + ("?" if optional else "")
+    
+    return branch(trie)
+
+
 class EcosystemCategorizer:
-    def __init__(self, api_key: str = None):
-        """Initialize categorizer with Anthropic API client"""
-        self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+    def __init__(self, api_key: str = None, max_workers: int = None, base_url: str = None,
+                 cache_path: str = None, cache_max_entries: int = 100_000):
+        """Initialize categorizer with Anthropic API client
+        
+        max_workers sets the number of threads used for directory scanning
+        (default: ThreadPoolExecutor's min(32, cpu_count + 4); 1 disables threads).
+        base_url points the API clients at another endpoint, e.g. a local fake server.
+        cache_path enables the persistent CategorizationCache for Claude analyses.
+        """
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.base_url = base_url
+        self.model = DEFAULT_MODEL
+        self.cache = CategorizationCache(cache_path, cache_max_entries) if cache_path else None
+        self.client = anthropic.Anthropic(api_key=self.api_key, base_url=base_url)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
         
         # Categories based on requirements analysis
         self.categories = {
@@ -48,110 +465,306 @@ class EcosystemCategorizer:
         }
         
         self.results = {}
+        self._build_keyword_index()
     
-    def scan_directory(self, base_path: str) -> Dict[str, List[str]]:
-        """Scan directory structure and collect file/folder information"""
-        base = Path(base_path)
+    def _build_keyword_index(self):
+        """Precompile the category keywords into one multi-pattern matcher.
+        
+        ``_keyword_index`` lists (keyword, category) in priority order: the
+        category dict order, minus keywords already claimed by an earlier
+        category and keywords containing uppercase letters (which can never
+        occur in a lowercased path). ``_keyword_search`` is a single regex
+        over all of them, its alternation factored by shared prefixes, that
+        finds the leftmost keyword in a path; ``_keyword_categories`` maps
+        each keyword to its category and to the keywords of the categories
+        ranked above it, the only ones that can still override the hit.
+        Call again after editing ``self.categories``.
+        """
+        index = []
+        seen = set()
+        for category, info in self.categories.items():
+            for keyword in info["keywords"]:
+                if keyword in seen or keyword != keyword.lower():
+                    continue
+                seen.add(keyword)
+                index.append((keyword, category))
+        self._keyword_index = tuple(index)
+        
+        ranks = {category: rank for rank, category in enumerate(self.categories)}
+        self._keyword_categories = {
+            keyword: (category, tuple(entry for entry in index if ranks[entry[1]] < ranks[category]))
+            for keyword, category in index
+        }
+        pattern = _prefix_alternation(keyword for keyword, _ in index) if index else "(?!)"
+        self._keyword_search = re.compile(pattern).search
+    
+    def scan_directory(self, base_path: str, tracker: CoverageTracker = None,
+                       compact: bool = False) -> Dict[str, List[str]]:
+        """Scan directory structure and collect file/folder information
+        
+        With compact=True paths go into a CompactPathStore and its
+        read-only {category: paths} view is returned instead of a dict.
+        """
+        store = CompactPathStore() if compact else None
         structure = {}
         
-        for item in base.rglob("*"):
-            if item.is_file() and item.suffix in ['.md', '.py', '.ipynb', '.txt']:
-                relative_path = str(item.relative_to(base))
-                category = self.categorize_path(relative_path)
-                
-                if category not in structure:
-                    structure[category] = []
-                structure[category].append(relative_path)
+        for relative_path in iter_walk_files(base_path, SCAN_SUFFIXES, self.max_workers):
+            category = self.categorize_path(relative_path)
+            if tracker:
+                tracker.record(category, "courses")
+            
+            if store is not None:
+                store.add(relative_path, category)
+                continue
+            if category not in structure:
+                structure[category] = []
+            structure[category].append(relative_path)
         
-        return structure
+        return store.view() if store is not None else structure
     
     def categorize_path(self, file_path: str) -> str:
         """Categorize a file path based on keywords and structure"""
         path_lower = file_path.lower()
         
-        # Check each category for keyword matches
-        for category, info in self.categories.items():
-            for keyword in info["keywords"]:
-                if keyword in path_lower:
-                    return category
+        match = self._keyword_search(path_lower)
+        if match is None:
+            # Default category for uncategorized items
+            return "general_utilities"
+        
+        # The leftmost keyword wins unless a higher-ranked category's keyword
+        # occurs further along the path (first category in order wins)
+        category, higher_ranked = self._keyword_categories[match.group()]
+        for keyword, higher_category in higher_ranked:
+            if keyword in path_lower:
+                return higher_category
+        return category
+    
+    def categorize_paths(self, paths):
+        """Vectorized categorize_path over a whole column of paths.
+        
+        Accepts a pandas Series (or any iterable of str) and returns
+        (categories, counts): a categorical Series aligned with the input,
+        with the same values categorize_path would give for each element,
+        and the number of paths per category. Each category is one regex
+        alternation of its keywords, matched in priority order over the
+        paths still uncategorized (RE2 via pyarrow when available).
+        """
+        # pandas/numpy are only needed for bulk mode
+        import numpy as np
+        import pandas as pd
+        
+        series = paths if isinstance(paths, pd.Series) else pd.Series(list(paths), dtype=object)
+        try:
+            lowered = series.astype("string[pyarrow]").str.lower()
+        except (ImportError, TypeError, ValueError):
+            lowered = series.astype(object).str.lower()
         
-        # Default category for uncategorized items
-        return "general_utilities"
+        labels = list(self.categories) + ["general_utilities"]
+        codes = np.full(len(series), len(labels) - 1, dtype=np.int16)
+        
+        # Positions (into `codes`) of paths that are still general_utilities
+        pending_positions = np.arange(len(series))
+        pending = lowered.reset_index(drop=True)
+        for code, category in enumerate(self.categories):
+            keywords = [re.escape(k) for k, c in self._keyword_index if c == category]
+            if not keywords or not len(pending):
+                continue
+            hits = pending.str.contains("|".join(keywords), regex=True).to_numpy(dtype=bool, na_value=False)
+            if hits.any():
+                codes[pending_positions[hits]] = code
+                pending_positions = pending_positions[~hits]
+                pending = pending[~hits].reset_index(drop=True)
+        
+        categories = pd.Series(pd.Categorical.from_codes(codes, categories=labels),
+                               index=series.index, name="category")
+        return categories, categories.value_counts(sort=False)
+    
+    def _read_excerpt(self, file_path: str) -> str:
+        """Read the first CONTENT_EXCERPT_CHARS characters of a file"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()[:CONTENT_EXCERPT_CHARS]
+    
+    def _build_prompt(self, file_path: str, content: str) -> str:
+        """Fill the categorization prompt for one file"""
+        return PROMPT_TEMPLATE.format(file_path=file_path, content=content)
     
     def analyze_with_claude(self, file_path: str, content: str = None) -> str:
         """Use Claude to analyze file content and determine category"""
         if content is None:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()[:2000]  # First 2000 chars
+                content = self._read_excerpt(file_path)
             except:
                 return "unreadable"
         
-        prompt = f"""
-        Analyze this file and categorize it based on what user problem it solves:
-
-        File: {file_path}
-        Content: {content}
-
-        Categories:
-        - developer_onboarding: Learning materials and educational content
-        - integration_tools: Tools for integrating Claude with external systems  
-        - production_patterns: Production-ready patterns and best practices
-        - multimodal_capabilities: Vision and document processing features
-        - automation_workflows: Tools for automating complex business processes
-        - quality_assurance: Testing, evaluation, and quality measurement tools
-
-        Respond with just the category name.
-        """
+        prompt = self._build_prompt(file_path, content)
+        cache_key = self._cache_key(prompt)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
             response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+                model=self.model,
                 max_tokens=50,
                 messages=[{"role": "user", "content": prompt}]
             )
-            return response.content[0].text.strip()
+            category = response.content[0].text.strip()
         except:
             return "analysis_failed"
+        
+        if cache_key:
+            self.cache.put(cache_key, category)
+        return category
+    
+    def _cache_key(self, prompt: str):
+        """Cache key for a rendered prompt, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return CategorizationCache.make_key(prompt, self.model)
+    
+    async def analyze_batch_async(self, file_paths: List[str], max_concurrency: int = 8,
+                                  requests_per_second: float = 5.0, max_retries: int = 5,
+                                  base_delay: float = 0.5, max_delay: float = 30.0) -> List[Dict]:
+        """Analyze many files concurrently with Claude.
+        
+        At most max_concurrency requests are in flight and requests start at no
+        more than requests_per_second (token bucket). 429, 5xx and connection
+        errors are retried up to max_retries times with jittered exponential
+        backoff. Returns one record per file, in input order:
+        
+            {"file_path", "category", "status", "attempts", "cached", "error", "elapsed_seconds"}
+        
+        status is "ok", "unreadable" or "failed"; category mirrors the values
+        analyze_with_claude returns for each case. Cache hits are "ok" with
+        cached=True and zero attempts.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        bucket = TokenBucket(requests_per_second)
+        # The SDK's own retries are disabled so attempts are counted here
+        client = anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        
+        async def analyze_one(file_path: str) -> Dict:
+            record = {"file_path": file_path, "category": None, "status": None,
+                      "attempts": 0, "cached": False, "error": None, "elapsed_seconds": 0.0}
+            start = time.monotonic()
+            try:
+                content = await asyncio.to_thread(self._read_excerpt, file_path)
+            except Exception as e:
+                record.update(category="unreadable", status="unreadable", error=str(e),
+                              elapsed_seconds=round(time.monotonic() - start, 3))
+                return record
+            
+            prompt = self._build_prompt(file_path, content)
+            cache_key = self._cache_key(prompt)
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                record.update(category=cached, status="ok", cached=True,
+                              elapsed_seconds=round(time.monotonic() - start, 3))
+                return record
+            async with semaphore:
+                while True:
+                    await bucket.acquire()
+                    record["attempts"] += 1
+                    try:
+                        response = await client.messages.create(
+                            model=self.model,
+                            max_tokens=50,
+                            messages=[{"role": "user", "content": prompt}]
+                        )
+                        record.update(category=response.content[0].text.strip(), status="ok", error=None)
+                        if cache_key:
+                            self.cache.put(cache_key, record["category"])
+                        break
+                    except Exception as e:
+                        record["error"] = f"{type(e).__name__}: {e}"
+                        if not _is_retryable(e) or record["attempts"] > max_retries:
+                            record.update(category="analysis_failed", status="failed")
+                            break
+                        await asyncio.sleep(_retry_delay(e, record["attempts"] - 1, base_delay, max_delay))
+            
+            record["elapsed_seconds"] = round(time.monotonic() - start, 3)
+            return record
+        
+        try:
+            return await asyncio.gather(*(analyze_one(str(path)) for path in file_paths))
+        finally:
+            await client.close()
+            if self.cache:
+                self.cache.flush()
+    
+    def analyze_batch(self, file_paths: List[str], **kwargs) -> List[Dict]:
+        """Synchronous wrapper around analyze_batch_async"""
+        return asyncio.run(self.analyze_batch_async(file_paths, **kwargs))
     
-    def categorize_cookbook(self, cookbook_path: str) -> Dict[str, Dict[str, List[str]]]:
+    def categorize_cookbook(self, cookbook_path: str, tracker: CoverageTracker = None,
+                            compact: bool = False) -> Dict[str, Dict[str, List[str]]]:
         """Categorize the entire cookbook structure"""
         results = {}
         cookbook = Path(cookbook_path)
         
         # Main sections to analyze
-        sections = ['skills', 'tool_use', 'multimodal', 'misc', 'third_party']
+        section_paths = [(section, cookbook / section) for section in COOKBOOK_SECTIONS]
+        section_paths = [(section, path) for section, path in section_paths if path.exists()]
         
-        for section in sections:
-            section_path = cookbook / section
-            if section_path.exists():
-                results[section] = self.scan_section(section_path)
+        # Sections are independent, so scan them concurrently (order preserved)
+        workers = min(self.max_workers, len(section_paths))
+        paths = [path for _, path in section_paths]
+        trackers = [tracker] * len(paths)
+        compacts = [compact] * len(paths)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                scanned = list(executor.map(self.scan_section, paths, trackers, compacts))
+        else:
+            scanned = list(map(self.scan_section, paths, trackers, compacts))
+        
+        for (section, _), section_results in zip(section_paths, scanned):
+            results[section] = section_results
         
         return results
     
-    def scan_section(self, section_path: Path) -> Dict[str, List[str]]:
+    def scan_section(self, section_path: Path, tracker: CoverageTracker = None,
+                     compact: bool = False) -> Dict[str, List[str]]:
         """Scan a cookbook section and categorize contents"""
+        store = CompactPathStore() if compact else None
         section_results = {}
+        section = Path(section_path).name
+        
+        for category, name in self.iter_section(section_path):
+            if tracker:
+                tracker.record(category, section)
+            if store is not None:
+                store.add(name, category)
+                continue
+            if category not in section_results:
+                section_results[category] = []
+            section_results[category].append(name)
+        
+        return store.view() if store is not None else section_results
+    
+    def iter_section(self, section_path: Path) -> Iterator[Tuple[str, str]]:
+        """Yield (category, entry name) for each entry of a cookbook section"""
+        with os.scandir(section_path) as entries:
+            for item in entries:
+                if item.is_dir():
+                    # Analyze subdirectory
+                    yield self.categorize_path(item.name), f"{item.name}/ (directory)"
+                    
+                elif os.path.splitext(item.name)[1] in SECTION_SUFFIXES:
+                    # Analyze individual files
+                    yield self.categorize_path(item.name), item.name
+    
+    def generate_report(self, base_path: str, progress_callback=None, progress_every: int = 1000,
+                        compact: bool = False) -> Dict:
+        """Generate comprehensive categorization report
         
-        for item in section_path.iterdir():
-            if item.is_dir():
-                # Analyze subdirectory
-                category = self.categorize_path(item.name)
-                if category not in section_results:
-                    section_results[category] = []
-                section_results[category].append(f"{item.name}/ (directory)")
-                
-            elif item.suffix in ['.ipynb', '.md', '.py']:
-                # Analyze individual files
-                category = self.categorize_path(item.name)
-                if category not in section_results:
-                    section_results[category] = []
-                section_results[category].append(item.name)
-        
-        return section_results
-    
-    def generate_report(self, base_path: str) -> Dict:
-        """Generate comprehensive categorization report"""
+        Coverage is counted while scanning (see CoverageTracker);
+        progress_callback receives a coverage snapshot every progress_every
+        entries. compact=True keeps the analysis sections in
+        CompactPathStore views (see path_store.py); save_report and
+        calculate_coverage accept them unchanged.
+        """
+        tracker = CoverageTracker(progress_callback, progress_every)
         cookbook_path = Path(base_path) / "anthropic-cookbook"
         courses_path = Path(base_path) / "anthropic-courses"
         
@@ -169,14 +782,14 @@ class EcosystemCategorizer:
         
         # Analyze cookbook if it exists
         if cookbook_path.exists():
-            report["cookbook_analysis"] = self.categorize_cookbook(str(cookbook_path))
+            report["cookbook_analysis"] = self.categorize_cookbook(str(cookbook_path), tracker, compact)
         
         # Analyze courses if it exists
         if courses_path.exists():
-            report["courses_analysis"] = self.scan_directory(str(courses_path))
+            report["courses_analysis"] = self.scan_directory(str(courses_path), tracker, compact)
         
-        # Calculate coverage metrics
-        report["coverage_metrics"] = self.calculate_coverage(report)
+        # Coverage was aggregated during the scan
+        report["coverage_metrics"] = tracker.metrics()
         
         return report
     
@@ -198,40 +811,389 @@ class EcosystemCategorizer:
             if category != "general_utilities":
                 categorized_files += len(files)
         
-        coverage_percent = (categorized_files / total_files * 100) if total_files > 0 else 0
-        
-        return {
-            "total_files_analyzed": total_files,
-            "categorized_files": categorized_files,
-            "coverage_percentage": round(coverage_percent, 1),
-            "meets_80_percent_goal": coverage_percent >= 80.0
-        }
+        return build_coverage_metrics(total_files, categorized_files)
     
     def save_report(self, report: Dict, output_file: str = "ecosystem_categorization_report.json"):
-        """Save categorization report to file"""
-        with open(output_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        """Save categorization report to file (atomically, via a temporary file)"""
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(report, f, indent=2, default=to_plain)
+        os.replace(tmp_file, output_file)
         
         print(f"Report saved to {output_file}")
         return output_file
 
+    
+    # --- Streaming output -------------------------------------------------
+    
+    def stream_report(self, base_path: str, output_file: str = "ecosystem_categorization_report.ndjson",
+                      flush_every: int = 1000, progress_callback=None, progress_every: int = 1000) -> Dict:
+        """Categorize base_path while writing one NDJSON record per entry.
+        
+        Record types, in order: one "header" (summary and category
+        definitions), a "section" marker before each cookbook section, one
+        "entry" per categorized file or directory, and a final "summary"
+        with the coverage metrics. Records are flushed every flush_every
+        entries, so a crashed run leaves everything written so far on
+        disk; load_ndjson_report rebuilds the nested report. Peak memory
+        does not grow with the number of files. progress_callback works as
+        in generate_report. Returns the coverage metrics.
+        """
+        cookbook_path = Path(base_path) / "anthropic-cookbook"
+        courses_path = Path(base_path) / "anthropic-courses"
+        header = self._empty_report(base_path)
+        tracker = CoverageTracker(progress_callback, progress_every)
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            def write(record):
+                f.write(json.dumps(record) + "\n")
+            
+            write({"type": "header", "summary": header["summary"],
+                   "category_definitions": header["category_definitions"]})
+            
+            def entries():
+                if cookbook_path.exists():
+                    for section in COOKBOOK_SECTIONS:
+                        section_path = cookbook_path / section
+                        if section_path.exists():
+                            write({"type": "section", "section": section})
+                            for category, name in self.iter_section(section_path):
+                                yield {"type": "entry", "source": "cookbook", "section": section,
+                                       "category": category, "path": name}
+                if courses_path.exists():
+                    for relative_path in iter_walk_files(courses_path, SCAN_SUFFIXES, self.max_workers):
+                        yield {"type": "entry", "source": "courses",
+                               "category": self.categorize_path(relative_path), "path": relative_path}
+            
+            for count, record in enumerate(entries(), 1):
+                write(record)
+                tracker.record(record["category"], record.get("section", "courses"))
+                if count % flush_every == 0:
+                    f.flush()
+            
+            metrics = tracker.metrics()
+            write({"type": "summary", "coverage_metrics": metrics})
+        
+        print(f"Report stream saved to {output_file}")
+        return metrics
+    
+    # --- Incremental mode -------------------------------------------------
+    #
+    # The manifest stores one record per scanned directory:
+    #     {"mtime_ns": int, "subdirs": [names], "files": {name: [mtime_ns, size, category]}}
+    # A directory whose mtime is unchanged has the same entry names, and
+    # categories depend only on paths, so its record is reused without
+    # listing it. Changed directories are re-listed and only entries that
+    # are new, or whose mtime/size changed, are re-classified.
+    #
+    # The manifest also records the SHA-256 of the report it was written
+    # with. A report rewritten by a full run (or left behind by a crash
+    # between the two writes) no longer matches, and the next incremental
+    # run rebuilds from scratch instead of patching a report it doesn't
+    # describe.
+    
+    @staticmethod
+    def manifest_path_for(report_file: str) -> str:
+        """Manifest file stored next to a report file"""
+        return str(Path(report_file).with_suffix(".manifest.json"))
+    
+    def _categories_fingerprint(self) -> str:
+        """Hash of the category definitions; a change invalidates the manifest"""
+        return hashlib.sha256(json.dumps(self.categories, sort_keys=True).encode()).hexdigest()
+    
+    def _empty_report(self, base_path: str) -> Dict:
+        """Report skeleton as produced by generate_report for an empty tree"""
+        return {
+            "summary": {
+                "total_categories": len(self.categories),
+                "analysis_timestamp": "2025-08-13",
+                "base_path": base_path
+            },
+            "category_definitions": self.categories,
+            "cookbook_analysis": {},
+            "courses_analysis": {},
+            "coverage_metrics": build_coverage_metrics(0, 0)
+        }
+    
+    def _refresh_directory(self, dir_path: str, relative_dir: str, previous: Dict, section_mode: bool):
+        """Return an up-to-date manifest record for one directory (None if it is gone)
+        
+        section_mode mirrors scan_section (subdirectories are entries, no
+        recursion); otherwise it mirrors scan_directory.
+        """
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
+        if previous is not None and previous["mtime_ns"] == mtime_ns:
+            return previous
+        
+        old_files = previous["files"] if previous else {}
+        files, subdirs = {}, []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if section_mode:
+                            if entry.is_dir():
+                                name, category_path = f"{entry.name}/ (directory)", entry.name
+                            elif os.path.splitext(entry.name)[1] in SECTION_SUFFIXES:
+                                name, category_path = entry.name, entry.name
+                            else:
+                                continue
+                        else:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                                continue
+                            if not (entry.is_file() and os.path.splitext(entry.name)[1] in SCAN_SUFFIXES):
+                                continue
+                            name = entry.name
+                            category_path = os.path.join(relative_dir, name) if relative_dir else name
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    
+                    old = old_files.get(name)
+                    if old and old[0] == stat.st_mtime_ns and old[1] == stat.st_size:
+                        files[name] = old
+                    else:
+                        files[name] = [stat.st_mtime_ns, stat.st_size, self.categorize_path(category_path)]
+        except OSError:
+            pass
+        
+        return {"mtime_ns": mtime_ns, "subdirs": subdirs, "files": files}
+    
+    def _refresh_tree(self, base_path: str, previous_dirs: Dict) -> Dict:
+        """Refresh manifest records for every directory under base_path, level by level"""
+        new_dirs = {}
+        level = [""]
+        
+        def refresh(args):
+            return self._refresh_directory(*args, section_mode=False)
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        try:
+            while level:
+                args = [(os.path.join(base_path, rel) if rel else base_path, rel, previous_dirs.get(rel))
+                        for rel in level]
+                records = executor.map(refresh, args) if executor else map(refresh, args)
+                next_level = []
+                for rel, record in zip(level, records):
+                    if record is None:
+                        continue
+                    new_dirs[rel] = record
+                    next_level.extend(os.path.join(rel, d) if rel else d for d in record["subdirs"])
+                level = next_level
+        finally:
+            if executor:
+                executor.shutdown()
+        return new_dirs
+    
+    @staticmethod
+    def _diff_directories(old_dirs: Dict, new_dirs: Dict, join_paths: bool):
+        """Compare manifest records; returns (added, removed, rescanned directory count)
+        
+        added/removed are lists of (report path, category). A re-categorized
+        entry appears in both.
+        """
+        added, removed = [], []
+        rescanned = 0
+        
+        def report_path(rel, name):
+            return os.path.join(rel, name) if join_paths and rel else name
+        
+        for rel, record in new_dirs.items():
+            old = old_dirs.get(rel)
+            if old is record:
+                continue
+            rescanned += 1
+            old_files = old["files"] if old else {}
+            for name, entry in record["files"].items():
+                prev = old_files.get(name)
+                if prev is None or prev[2] != entry[2]:
+                    if prev is not None:
+                        removed.append((report_path(rel, name), prev[2]))
+                    added.append((report_path(rel, name), entry[2]))
+            for name, prev in old_files.items():
+                if name not in record["files"]:
+                    removed.append((report_path(rel, name), prev[2]))
+        
+        for rel, old in old_dirs.items():
+            if rel not in new_dirs:
+                removed.extend((report_path(rel, name), prev[2]) for name, prev in old["files"].items())
+        
+        return added, removed, rescanned
+    
+    @staticmethod
+    def _patch_analysis(analysis: Dict[str, List[str]], added: List, removed: List):
+        """Apply added/removed (path, category) pairs to a category -> paths dict in place"""
+        removed_by_category = defaultdict(set)
+        for path, category in removed:
+            removed_by_category[category].add(path)
+        for category, paths in removed_by_category.items():
+            if category in analysis:
+                analysis[category] = [p for p in analysis[category] if p not in paths]
+                if not analysis[category]:
+                    del analysis[category]
+        for path, category in added:
+            analysis.setdefault(category, []).append(path)
+    
+    def _load_incremental_state(self, base_path: str, report_file: str):
+        """Load (report, manifest) from disk, or fresh ones if they are missing or stale
+        
+        The manifest is stale when its version, base_path or categories
+        differ, or when the report on disk is not the one it was written with.
+        """
+        manifest_file = self.manifest_path_for(report_file)
+        try:
+            with open(manifest_file) as f:
+                manifest = json.load(f)
+            with open(report_file, 'rb') as f:
+                report_bytes = f.read()
+            if (manifest.get("version") == MANIFEST_VERSION
+                    and manifest.get("base_path") == base_path
+                    and manifest.get("categories_fingerprint") == self._categories_fingerprint()
+                    and manifest.get("report_sha256") == hashlib.sha256(report_bytes).hexdigest()):
+                return json.loads(report_bytes), manifest
+        except (OSError, ValueError):
+            pass
+        
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "base_path": base_path,
+            "categories_fingerprint": self._categories_fingerprint(),
+            "cookbook": {},
+            "courses": {}
+        }
+        return self._empty_report(base_path), manifest
+    
+    def update_report(self, base_path: str, report_file: str = "ecosystem_categorization_report.json") -> Dict:
+        """Incrementally update a saved report and its manifest, then save both.
+        
+        Only added or changed entries are re-classified and deleted entries
+        are dropped; cookbook_analysis, courses_analysis and coverage_metrics
+        are patched in place. Without a usable manifest (first run, other
+        base_path, edited categories, a report rewritten by a full run)
+        this builds everything from scratch.
+        """
+        report, manifest = self._load_incremental_state(base_path, report_file)
+        cookbook_path = Path(base_path) / "anthropic-cookbook"
+        courses_path = Path(base_path) / "anthropic-courses"
+        all_added, all_removed = [], []
+        rescanned = 0
+        
+        # Cookbook: one record per section (top level only, like scan_section)
+        new_sections = {}
+        for section in COOKBOOK_SECTIONS:
+            previous = manifest["cookbook"].get(section)
+            record = self._refresh_directory(str(cookbook_path / section), "", previous, section_mode=True)
+            old = {section: previous} if previous else {}
+            new = {section: record} if record else {}
+            added, removed, count = self._diff_directories(old, new, join_paths=False)
+            rescanned += count
+            
+            if record is not None:
+                new_sections[section] = record
+                self._patch_analysis(report["cookbook_analysis"].setdefault(section, {}), added, removed)
+            else:
+                report["cookbook_analysis"].pop(section, None)
+            all_added.extend(added)
+            all_removed.extend(removed)
+        
+        # Courses: full recursive tree, like scan_directory
+        new_dirs = self._refresh_tree(str(courses_path), manifest["courses"]) if courses_path.exists() else {}
+        added, removed, count = self._diff_directories(manifest["courses"], new_dirs, join_paths=True)
+        rescanned += count
+        self._patch_analysis(report["courses_analysis"], added, removed)
+        all_added.extend(added)
+        all_removed.extend(removed)
+        
+        # Patch coverage with the deltas instead of recounting everything
+        metrics = report["coverage_metrics"]
+        total = metrics["total_files_analyzed"] + len(all_added) - len(all_removed)
+        categorized = (metrics["categorized_files"]
+                       + sum(1 for _, c in all_added if c != "general_utilities")
+                       - sum(1 for _, c in all_removed if c != "general_utilities"))
+        report["coverage_metrics"] = build_coverage_metrics(total, categorized)
+        
+        manifest["cookbook"] = new_sections
+        manifest["courses"] = new_dirs
+        self.save_report(report, report_file)
+        manifest["report_sha256"] = self._file_sha256(report_file)
+        self._write_json_atomic(manifest, self.manifest_path_for(report_file))
+        
+        print(f"♻️  Incremental update: +{len(all_added)} / -{len(all_removed)} entries, "
+              f"{rescanned} directories rescanned")
+        return report
+    
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        """Hash a file in chunks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _write_json_atomic(data, output_file: str):
+        """Write JSON via a temporary file and rename, so readers never see a partial file"""
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, output_file)
+
+def print_progress(snapshot: Dict):
+    """Progress callback printing the live 80% gate status"""
+    gate = "met" if snapshot["meets_80_percent_goal"] else "not met"
+    print(f"⏳ {snapshot['total_files_analyzed']} files, coverage {snapshot['coverage_percentage']}% "
+          f"(80% gate: {gate})", flush=True)
+
 
 def main():
     """Main function to run ecosystem categorization"""
+    parser = argparse.ArgumentParser(description="Categorize Anthropic's ecosystem components")
+    parser.add_argument("--base-path", default="/home/moin/learning-software-development-lab",
+                        help="Directory containing anthropic-cookbook and anthropic-courses")
+    parser.add_argument("--output", default="ecosystem_categorization_report.json", help="Report file")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-classify entries changed since the last run (uses a manifest next to the report)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write NDJSON records while scanning instead of one JSON document")
+    parser.add_argument("--compact", action="store_true",
+                        help="Hold categorized paths in compact array-backed storage (full runs)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Print live coverage while scanning (full and --stream runs)")
+    parser.add_argument("--rebuild-from", metavar="NDJSON",
+                        help="Rebuild the nested JSON report (--output) from an NDJSON stream, without scanning")
+    args = parser.parse_args()
+    
     print("🔍 Starting Anthropic Ecosystem Categorization...")
     
     # Initialize categorizer
     categorizer = EcosystemCategorizer()
+    base_path = args.base_path
+    progress = print_progress if args.progress else None
     
-    # Set base path to current directory
-    base_path = "/home/moin/learning-software-development-lab"
-    
-    # Generate comprehensive report
-    print("📊 Analyzing ecosystem structure...")
-    report = categorizer.generate_report(base_path)
-    
-    # Save results
-    output_file = categorizer.save_report(report)
+    if args.rebuild_from:
+        print(f"📊 Rebuilding report from {args.rebuild_from}...")
+        report = load_ndjson_report(args.rebuild_from)
+        output_file = categorizer.save_report(report, args.output)
+    elif args.stream:
+        output_file = str(Path(args.output).with_suffix(".ndjson"))
+        print("📊 Streaming ecosystem structure...")
+        report = {"coverage_metrics": categorizer.stream_report(base_path, output_file, progress_callback=progress)}
+    elif args.incremental:
+        print("📊 Updating ecosystem structure incrementally...")
+        report = categorizer.update_report(base_path, args.output)
+        output_file = args.output
+    else:
+        # Generate comprehensive report
+        print("📊 Analyzing ecosystem structure...")
+        report = categorizer.generate_report(base_path, progress_callback=progress, compact=args.compact)
+        
+        # Save results
+        output_file = categorizer.save_report(report, args.output)
     
     # Print summary
     metrics = report["coverage_metrics"]
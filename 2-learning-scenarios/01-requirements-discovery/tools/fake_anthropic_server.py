@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Fake Anthropic Messages API Server
+Local stand-in for exercising EcosystemCategorizer.analyze_batch offline.
+
+Serves POST /v1/messages with configurable latency and deliberately injected
+errors (429 rate limits, 500 and 529 server errors), so retries, backoff and
+rate limiting can be observed without spending API credits.
+
+Usage:
+    python fake_anthropic_server.py --port 8765 --latency-ms 200 --error-rate 0.2
+    python fake_anthropic_server.py --demo-files 200   # run a batch against it
+    python fake_anthropic_server.py --demo-files 200 --cache-path /tmp/cat.sqlite  # second pass hits cache
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CATEGORIES = [
+    "developer_onboarding", "integration_tools", "production_patterns",
+    "multimodal_capabilities", "automation_workflows", "quality_assurance",
+]
+
+# status code -> Anthropic error type, for injected failures
+INJECTED_ERRORS = {
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+
+class FakeMessagesHandler(BaseHTTPRequestHandler):
+    """Answers Messages API calls with a deterministic category per file"""
+
+    server_version = "FakeAnthropic/1.0"
+
+    def do_POST(self):
+        config = self.server.config
+        body = self.rfile.read(int(self.headers.get("content-length", 0)))
+
+        latency = max(0.0, random.gauss(config["latency_ms"], config["jitter_ms"])) / 1000
+        time.sleep(latency)
+
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+
+        if self.path.split("?")[0] != "/v1/messages":
+            return self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+        if random.random() < config["error_rate"]:
+            status = random.choice(list(INJECTED_ERRORS))
+            with self.server.lock:
+                self.server.stats[f"injected_{status}"] += 1
+            headers = {"retry-after": "0"} if status == 429 else {}
+            return self._send(status, {"type": "error", "error": {
+                "type": INJECTED_ERRORS[status], "message": "Injected by fake server"}}, headers)
+
+        request = json.loads(body or b"{}")
+        prompt = request.get("messages", [{}])[0].get("content", "")
+        file_line = next((line.strip() for line in prompt.splitlines() if line.strip().startswith("File:")), "")
+        category = CATEGORIES[zlib.crc32(file_line.encode()) % len(CATEGORIES)]
+
+        self._send(200, {
+            "id": f"msg_fake_{self.server.stats['requests']}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": [{"type": "text", "text": category}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 3},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.config["verbose"]:
+            super().log_message(format, *args)
+
+
+def start_server(port: int = 0, latency_ms: float = 100, jitter_ms: float = 30,
+                 error_rate: float = 0.1, verbose: bool = False) -> ThreadingHTTPServer:
+    """Start the fake server in a background thread and return it (port 0 = any free port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeMessagesHandler)
+    server.daemon_threads = True
+    server.config = {"latency_ms": latency_ms, "jitter_ms": jitter_ms,
+                     "error_rate": error_rate, "verbose": verbose}
+    server.stats = Counter()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_demo(server: ThreadingHTTPServer, file_count: int, concurrency: int, rate: float,
+             cache_path: str = None):
+    """Categorize synthetic files through the fake server and print a summary
+
+    With cache_path the batch runs twice; the second pass should make no requests.
+    """
+    from ecosystem_categorizer import EcosystemCategorizer
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    categorizer = EcosystemCategorizer(api_key="fake-key", base_url=base_url, cache_path=cache_path)
+    passes = 2 if cache_path else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(file_count):
+            path = Path(tmp) / f"notebook_{i}.md"
+            path.write_text(f"# Example {i}\n")
+            paths.append(str(path))
+        paths.append(str(Path(tmp) / "missing.md"))
+
+        for run in range(1, passes + 1):
+            requests_before = server.stats["requests"]
+            start = time.monotonic()
+            records = categorizer.analyze_batch(paths, max_concurrency=concurrency,
+                                                requests_per_second=rate, base_delay=0.05)
+            elapsed = time.monotonic() - start
+
+            statuses = Counter(r["status"] for r in records)
+            retried = sum(1 for r in records if r["attempts"] > 1)
+            print(f"\n✅ Pass {run}: {len(records)} files in {elapsed:.2f}s")
+            print(f"📊 Status: {dict(statuses)}")
+            print(f"🔁 Files retried: {retried}")
+            print(f"🛰️  Server requests this pass: {server.stats['requests'] - requests_before}")
+
+    print(f"\n🛰️  Server totals: {dict(server.stats)}")
+    if categorizer.cache:
+        print(f"🗄️  Cache: {categorizer.cache.report()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API for offline batch testing")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=30, help="Latency standard deviation")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Fraction of requests failing with 429/500/529")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--demo-files", type=int, help="Run analyze_batch over N synthetic files, then exit")
+    parser.add_argument("--concurrency", type=int, default=16, help="Demo: max in-flight requests")
+    parser.add_argument("--rate", type=float, default=50, help="Demo: requests per second")
+    parser.add_argument("--cache-path", help="Demo: SQLite categorization cache (runs the batch twice)")
+    args = parser.parse_args()
+
+    server = start_server(0 if args.demo_files else args.port, args.latency_ms,
+                          args.jitter_ms, args.error_rate, args.verbose)
+
+    if args.demo_files:
+        run_demo(server, args.demo_files, args.concurrency, args.rate, args.cache_path)
+        server.shutdown()
+        return
+
+    print(f"🛰️  Fake Anthropic API on http://127.0.0.1:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Compact Path Store
+Array-backed storage for categorized relative paths.
+
+Large scans produce millions of (path, category) pairs. Storing each path
+as its own Python str inside per-category lists costs well over 100 bytes
+per entry. CompactPathStore interns directory prefixes in a prefix table,
+packs file names into one UTF-8 buffer and keeps category IDs in an
+array('B'), which brings an entry down to roughly its name length plus
+9 bytes (about 30% of the list-of-str layout on typical course paths).
+
+The store still exposes the Dict[str, List[str]]-shaped view that
+EcosystemCategorizer.generate_report and calculate_coverage work with.
+"""
+
+import os
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List
+
+SEPARATORS = {'/', os.sep}
+
+
+class CompactPathStore:
+    """Append-only (path, category) store with interned directory prefixes"""
+
+    def __init__(self):
+        self._prefix_ids = {}
+        self._prefixes = []
+        self._category_ids = {}
+        self._categories = []
+        self._counts = []
+
+        self._prefix_column = array('I')
+        self._category_column = array('B')
+        self._name_ends = array('I')
+        self._names = bytearray()
+
+    def add(self, path: str, category: str):
+        """Append one categorized path"""
+        split = max(path.rfind(sep) for sep in SEPARATORS) + 1
+        prefix, name = path[:split], path[split:]
+
+        prefix_id = self._prefix_ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = self._prefix_ids[prefix] = len(self._prefixes)
+            self._prefixes.append(prefix)
+
+        category_id = self._category_ids.get(category)
+        if category_id is None:
+            if len(self._categories) == 256:
+                raise ValueError("CompactPathStore supports at most 256 categories")
+            category_id = self._category_ids[category] = len(self._categories)
+            self._categories.append(category)
+            self._counts.append(0)
+
+        self._names += name.encode('utf-8', errors='surrogateescape')
+        if len(self._names) > 0xFFFFFFFF and self._name_ends.typecode == 'I':
+            # Name buffer outgrew 32-bit offsets
+            self._name_ends = array('Q', self._name_ends)
+        self._name_ends.append(len(self._names))
+        self._prefix_column.append(prefix_id)
+        self._category_column.append(category_id)
+        self._counts[category_id] += 1
+
+    def __len__(self) -> int:
+        return len(self._category_column)
+
+    def path(self, index: int) -> str:
+        """Rebuild the full relative path of entry `index`"""
+        start = self._name_ends[index - 1] if index else 0
+        name = self._names[start:self._name_ends[index]].decode('utf-8', errors='surrogateescape')
+        return self._prefixes[self._prefix_column[index]] + name
+
+    def category(self, index: int) -> str:
+        return self._categories[self._category_column[index]]
+
+    def category_counts(self) -> Dict[str, int]:
+        """Number of entries per category, in first-seen order"""
+        return dict(zip(self._categories, self._counts))
+
+    def iter_category(self, category: str) -> Iterator[str]:
+        """Yield the paths of one category in insertion order"""
+        category_id = self._category_ids.get(category)
+        if category_id is None:
+            return
+        for index, value in enumerate(self._category_column):
+            if value == category_id:
+                yield self.path(index)
+
+    def view(self) -> "CategoryPathsView":
+        """Read-only Dict[str, List[str]]-like view grouped by category"""
+        return CategoryPathsView(self)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        """Materialize the plain {category: [paths]} dict in one pass"""
+        result = {category: [] for category in self._categories}
+        for index in range(len(self)):
+            result[self._categories[self._category_column[index]]].append(self.path(index))
+        return result
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the columns, name buffer and prefix table"""
+        columns = (self._prefix_column, self._category_column, self._name_ends)
+        return (sum(col.itemsize * len(col) for col in columns)
+                + len(self._names)
+                + sum(len(prefix) + 49 for prefix in self._prefixes))
+
+
+class CategoryPaths(Sequence):
+    """Lazy list of the paths in one category of a CompactPathStore"""
+
+    def __init__(self, store: CompactPathStore, category: str):
+        self._store = store
+        self._category = category
+        self._positions = None
+
+    def __len__(self) -> int:
+        return self._store.category_counts().get(self._category, 0)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._store.iter_category(self._category)
+
+    def __getitem__(self, index):
+        # Row positions for this category are indexed on first random access
+        if self._positions is None or len(self._positions) != len(self):
+            category_id = self._store._category_ids[self._category]
+            self._positions = array('Q', (i for i, value in enumerate(self._store._category_column)
+                                          if value == category_id))
+        if isinstance(index, slice):
+            return [self._store.path(i) for i in self._positions[index]]
+        return self._store.path(self._positions[index])
+
+    def __repr__(self) -> str:
+        return f"CategoryPaths({self._category!r}, {len(self)} paths)"
+
+
+class CategoryPathsView(Mapping):
+    """{category: CategoryPaths} mapping over a CompactPathStore"""
+
+    def __init__(self, store: CompactPathStore):
+        self._store = store
+
+    def __getitem__(self, category: str) -> CategoryPaths:
+        if category not in self._store._category_ids:
+            raise KeyError(category)
+        return CategoryPaths(self._store, category)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.category_counts())
+
+    def __len__(self) -> int:
+        return len(self._store.category_counts())
+
+    @property
+    def store(self) -> CompactPathStore:
+        return self._store
+
+
+def to_plain(value):
+    """json.dump default hook: turn store views into plain dicts/lists"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -10,71 +10,141 @@ import os
 import argparse
 from datetime import datetime
 import glob
-import json
-import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+
+from session_git import GitRepository, GitUnavailable, relative_date
+from session_files import recent_files
+from session_logs import DailyLogIndex
+
+# Seconds each briefing part may take before its fallback text is shown
+EVOLUTION_TIMEOUT = 5
+ENDPOINT_TIMEOUT = 5
+WORKSPACE_TIMEOUT = 15
+
+def open_repository():
+    """The git reader shared by the briefing sections, or None outside a repo."""
+    try:
+        return GitRepository()
+    except GitUnavailable:
+        return None
 
-def get_project_evolution():
+def get_project_evolution(repo):
     """Gets the last 5 git commits to show project evolution."""
     try:
-        result = subprocess.run(
-            ['git', 'log', '-n', '5', '--pretty=format:- %h %s (%cr)'] ,
-            capture_output=True, text=True, check=True
-        )
-        return result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        if repo is None:
+            raise GitUnavailable("not a git repository")
+        now = time.time()
+        return "\n".join(
+            f"- {repo.abbreviate(c.sha)} {c.subject} ({relative_date(c.committer_time, now)})"
+            for c in repo.log(5)
+        ).strip()
+    except (GitUnavailable, OSError):
         return "Could not retrieve git log. Is git installed and in a repo?"
 
 def get_last_session_endpoint():
     """Finds the latest daily log and returns the last few lines."""
     try:
         log_dir = "4-project-management/logs-and-debriefs/daily/"
-        list_of_files = glob.glob(os.path.join(log_dir, '*.md'))
-        if not list_of_files:
-            return "No daily logs found."
-        
-        latest_file = max(list_of_files, key=os.path.getctime)
-        with open(latest_file, 'r') as f:
-            lines = f.readlines()
-        
+        logs = DailyLogIndex(log_dir)
         # Return the last 20 lines to get the session's end context
-        return f"From: {os.path.basename(latest_file)}\n...\n{''.join(lines[-20:])}"
+        found = logs.tail(20)
+        logs.save()
+        if found is None:
+            return "No daily logs found."
+
+        latest_file, lines = found
+        return f"From: {latest_file}\n...\n{''.join(lines)}"
     except Exception as e:
         return f"Error reading logs: {e}"
 
-def get_workspace_state(scenario_num):
-    """Gets uncommitted git changes and recently modified files."""
-    state_parts = []
-    # Git status
+def get_uncommitted_changes(repo):
+    """Gets the uncommitted git changes part of the workspace state."""
     try:
-        result = subprocess.run(
-            ['git', 'status', '--porcelain'],
-            capture_output=True, text=True, check=True
-        )
-        if result.stdout.strip():
-            state_parts.append("**Uncommitted Changes:**\n" + result.stdout.strip())
-        else:
-            state_parts.append("**Uncommitted Changes:**\nClean workspace.")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        state_parts.append("**Uncommitted Changes:**\nCould not retrieve git status.")
-
-    # Recently modified files in scenario
+        if repo is None:
+            raise GitUnavailable("not a git repository")
+        status = repo.status_porcelain()
+        if status.strip():
+            return "**Uncommitted Changes:**\n" + status.strip()
+        return "**Uncommitted Changes:**\nClean workspace."
+    except GitUnavailable:
+        return "**Uncommitted Changes:**\nCould not retrieve git status."
+
+def get_recent_scenario_files(scenario_num):
+    """Gets the recently modified files part of the workspace state (None if there are none)."""
     try:
         scenario_path_pattern = f"2-learning-scenarios/{str(scenario_num).zfill(2)}-*"
         scenario_dirs = glob.glob(scenario_path_pattern)
         if scenario_dirs:
             scenario_dir = scenario_dirs[0]
-            files = [os.path.join(dp, f) for dp, dn, fn in os.walk(scenario_dir) for f in fn]
+            files = recent_files(scenario_dir, 3)
             if files:
-                files.sort(key=os.path.getmtime, reverse=True)
                 recent_files_str = "\n".join([
-                    f"- {os.path.basename(f)} (modified: {datetime.fromtimestamp(os.path.getmtime(f)).strftime('%Y-%m-%d %H:%M:%S')})"
-                    for f in files[:3]
+                    f"- {os.path.basename(f)} (modified: {datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')})"
+                    for f, mtime in files
                 ])
-                state_parts.append("**Recently Modified Scenario Files:**\n" + recent_files_str)
+                return "**Recently Modified Scenario Files:**\n" + recent_files_str
     except Exception as e:
-        state_parts.append(f"**Recently Modified Scenario Files:**\nCould not retrieve recent files: {e}")
-        
-    return "\n\n".join(state_parts)
+        return f"**Recently Modified Scenario Files:**\nCould not retrieve recent files: {e}"
+    return None
+
+def get_workspace_state(scenario_num, repo):
+    """Gets uncommitted git changes and recently modified files."""
+    state_parts = [get_uncommitted_changes(repo), get_recent_scenario_files(scenario_num)]
+    return "\n\n".join(part for part in state_parts if part is not None)
+
+class BriefingTask:
+    """One part of the briefing, computed on its own thread.
+
+    result() waits at most `timeout` seconds from start() and returns
+    `fallback` if the part failed or is still running. Threads are
+    daemonic, so a hung part never keeps the script from exiting.
+    """
+
+    def __init__(self, name, build, fallback, timeout):
+        self.name = name
+        self.build = build
+        self.fallback = fallback
+        self.timeout = timeout
+        self.future = Future()
+        self.started = None
+        self.seconds = None
+        self.status = "ok"
+
+    def start(self):
+        self.started = time.perf_counter()
+        threading.Thread(target=self._run, name=f"briefing-{self.name}", daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            text = self.build()
+        except Exception as e:
+            self.seconds = time.perf_counter() - self.started
+            self.future.set_exception(e)
+        else:
+            self.seconds = time.perf_counter() - self.started
+            self.future.set_result(text)
+
+    def result(self):
+        remaining = self.started + self.timeout - time.perf_counter()
+        try:
+            return self.future.result(timeout=max(remaining, 0))
+        except FuturesTimeout:
+            self.status = f"timed out after {self.timeout}s"
+            self.seconds = self.timeout
+        except Exception as e:
+            self.status = f"failed: {e}"
+        return self.fallback
+
+def print_profile(tasks, total):
+    """Per-part timings of the briefing, on stderr so the briefing stays clean."""
+    print("\n--- Briefing profile ---", file=sys.stderr)
+    for task in tasks:
+        print(f"{task.name:<24} {task.seconds * 1000:8.1f} ms  {task.status}", file=sys.stderr)
+    print(f"{'total (wall)':<24} {total * 1000:8.1f} ms", file=sys.stderr)
 
 def get_scenario_name(scenario_num):
     """Map scenario number to discovery focus."""
@@ -116,6 +186,8 @@ Ready to start with tiny, approved increments?"""
 def main():
     parser = argparse.ArgumentParser(description="Start discovery learning session with a comprehensive briefing for the AI assistant.")
     parser.add_argument("--scenario", "-s", type=int, required=True, help="Scenario number (1-6)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-section timings to stderr after the briefing")
     args = parser.parse_args()
 
     if not 1 <= args.scenario <= 6:
@@ -123,7 +195,26 @@ def main():
         return
 
     scenario_name = get_scenario_name(args.scenario)
-    
+
+    # Every part mostly waits on git or the disk, so all of them start
+    # now and are printed in order as they finish. One git reader serves
+    # every part: commits come straight from .git, only the worktree
+    # status starts a git process.
+    begin = time.perf_counter()
+    repo = open_repository()
+    evolution, endpoint, changes, recent = tasks = [
+        BriefingTask("project evolution", lambda: get_project_evolution(repo),
+                     "Could not retrieve git log.", EVOLUTION_TIMEOUT).start(),
+        BriefingTask("last session endpoint", get_last_session_endpoint,
+                     "Could not read the daily logs.", ENDPOINT_TIMEOUT).start(),
+        BriefingTask("uncommitted changes", lambda: get_uncommitted_changes(repo),
+                     "**Uncommitted Changes:**\nCould not retrieve git status.",
+                     WORKSPACE_TIMEOUT).start(),
+        BriefingTask("recent scenario files", lambda: get_recent_scenario_files(args.scenario),
+                     "**Recently Modified Scenario Files:**\nCould not retrieve recent files.",
+                     WORKSPACE_TIMEOUT).start(),
+    ]
+
     # --- GENERATE THE NEW COMPREHENSIVE BRIEFING ---
     print("# SESSION BRIEFING")
     print("\n## 1. Mission Context")
@@ -131,19 +222,27 @@ def main():
     print(f"- **Objective:** Systematically analyze the target ecosystem to discover and document its practices.")
 
     print("\n## 2. Project Evolution (Recent Commits)")
-    print(get_project_evolution())
+    print(evolution.result())
 
     print("\n## 3. Last Session Endpoint (from latest daily log)")
-    print(get_last_session_endpoint())
+    print(endpoint.result())
 
     print("\n## 4. Current Workspace State")
-    print(get_workspace_state(args.scenario))
-    
+    state_parts = [changes.result(), recent.result()]
+    print("\n\n".join(part for part in state_parts if part is not None))
+    total = time.perf_counter() - begin
+    # A part still running past its timeout may be using the repository
+    if repo is not None and all(task.future.done() for task in tasks):
+        repo.close()
+
     print("\n" + "="*60)
     print("AI ASSISTANT INSTRUCTIONS")
     print("="*60)
     print("\n**Your first task is to rephrase the 'SESSION BRIEFING' above in your own words to confirm you have a deep understanding of the project's evolution and current status. Then, await further instructions.**")
 
+    if args.profile:
+        print_profile(tasks, total)
+
     # --- OLD CONTEXT FOR REFERENCE (can be removed later) ---
     # print("\nCONTEXT PROMPT (for reference):")
     # print("-" * 40)
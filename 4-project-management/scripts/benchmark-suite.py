@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the ecosystem categorizer and notebook tooling.
+
+Generates synthetic directory trees and notebook corpora, times the
+categorizer scans, notebook validation, the fix-notebook passes and (when
+Jupyter is installed) notebook execution through jupyter-nbconvert versus
+the warm kernel pool, and appends the results to a JSON history file. Each timing is compared with
+the median of recent runs at the same scale; a slowdown beyond the
+threshold is reported as a regression (exit code 1).
+
+Scales:
+    small   1k files,   notebooks of 10-100 cells
+    medium  100k files, notebooks of 10-1000 cells
+    large   1M files,   notebooks of 10-10000 cells
+
+Usage:
+    python 4-project-management/scripts/benchmark-suite.py --scale small
+    python 4-project-management/scripts/benchmark-suite.py --scale medium --repeat 5 --threshold 0.15
+    python 4-project-management/scripts/benchmark-suite.py --files 20000 --max-cells 500
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent.parent
+TOOLS_DIR = REPO_ROOT / "2-learning-scenarios" / "01-requirements-discovery" / "tools"
+DEFAULT_HISTORY = REPO_ROOT / "4-project-management" / "logs-and-debriefs" / "benchmarks" / "history.json"
+DEFAULT_WORKDIR = REPO_ROOT / ".cache" / "benchmarks"
+
+SCALES = {
+    "small": {"files": 1_000, "min_cells": 10, "max_cells": 100, "notebooks": 20},
+    "medium": {"files": 100_000, "min_cells": 10, "max_cells": 1_000, "notebooks": 50},
+    "large": {"files": 1_000_000, "min_cells": 10, "max_cells": 10_000, "notebooks": 100},
+}
+
+# Smallest corpus notebooks executed per run by the execution benchmarks
+EXECUTION_NOTEBOOKS = 4
+
+# Same relative path the fix scripts open
+FIX_NOTEBOOK_PATH = Path("scenario-based-learning/01-requirements-discovery/analysis/scenario1-deep-dive-analysis.ipynb")
+
+PATH_WORDS = ["course", "tutorial", "tool_use", "vision", "agent", "misc", "data", "utils",
+              "evaluation", "examples", "rag", "notes", "batch", "helpers", "pdf", "summary"]
+SUFFIXES = [".md", ".py", ".ipynb", ".txt", ".json", ".png"]
+COOKBOOK_SECTIONS = ["skills", "tool_use", "multimodal", "misc", "third_party"]
+
+
+def load_script(filename, module_name):
+    """Import a hyphenated script from this directory as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- Synthetic data ---------------------------------------------------------
+
+def generate_tree(base, file_count, rng, files_per_dir=25):
+    """Create file_count empty files spread over nested keyword-ish directories"""
+    for i in range(file_count):
+        if i % files_per_dir == 0:
+            depth = rng.randint(0, 4)
+            directory = base.joinpath(*(f"{rng.choice(PATH_WORDS)}_{rng.randint(0, 9)}" for _ in range(depth)))
+            directory.mkdir(parents=True, exist_ok=True)
+        name = f"{i:07d}_{rng.choice(PATH_WORDS)}{rng.choice(SUFFIXES)}"
+        open(directory / name, "w").close()
+
+
+def generate_ecosystem(base, file_count, rng):
+    """anthropic-courses gets ~90% of the files, the cookbook sections the rest"""
+    courses_files = int(file_count * 0.9)
+    generate_tree(base / "anthropic-courses", courses_files, rng)
+    per_section = max(1, (file_count - courses_files) // len(COOKBOOK_SECTIONS))
+    for section in COOKBOOK_SECTIONS:
+        generate_tree(base / "anthropic-cookbook" / section, per_section, rng, files_per_dir=per_section)
+
+
+def code_cell(source, index, error=False):
+    outputs = [{"output_type": "stream", "name": "stdout", "text": [f"result {index}\n"]}]
+    if error:
+        outputs.append({"output_type": "error", "ename": "ValueError", "evalue": "synthetic", "traceback": []})
+    return {"cell_type": "code", "execution_count": index, "metadata": {},
+            "outputs": outputs, "source": [source]}
+
+
+def markdown_cell(source):
+    return {"cell_type": "markdown", "metadata": {}, "source": [source]}
+
+
+def generate_notebook(cell_count, rng):
+    """Notebook with alternating markdown/code cells, a few unexecuted or failing"""
+    cells = []
+    for i in range(cell_count):
+        if i % 2 == 0:
+            cells.append(markdown_cell(f"### Step {i}\n\nExplanation of step {i}."))
+        else:
+            cell = code_cell(f"value_{i} = {i} * 2\nprint(value_{i})", i, error=rng.random() < 0.01)
+            if rng.random() < 0.02:
+                cell["execution_count"] = None
+            cells.append(cell)
+    return {
+        "cells": cells,
+        "metadata": {
+            "kernelspec": {"display_name": "Python 3", "language": "python", "name": "python3"},
+            "language_info": {"name": "python", "version": "3.11"},
+        },
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def generate_notebook_corpus(base, count, min_cells, max_cells, rng):
+    """Notebooks with cell counts spread log-uniformly between min_cells and max_cells"""
+    base.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        fraction = i / max(1, count - 1)
+        cells = int(round(min_cells * (max_cells / min_cells) ** fraction))
+        with open(base / f"notebook_{i:04d}_{cells}cells.ipynb", "w") as f:
+            json.dump(generate_notebook(cells, rng), f, indent=1)
+
+
+def generate_fix_notebook(cell_count):
+    """Scenario 1 notebook with every section/question marker plus filler cells"""
+    cells = [
+        markdown_cell("# Scenario 1 Deep Dive Analysis - Iteration 1"),
+        markdown_cell("## 1. Understanding Our Measurements"),
+        markdown_cell("### Question 1.1: What share of files is onboarding?"),
+        code_cell("# Question 1.1 - calculate these percentages", 1),
+        markdown_cell("### Question 1.2: Which files serve several purposes?"),
+        code_cell("# Phase 1: Understanding the Categorization Tool", 2),
+        code_cell("# Phase 2: Identifying Multi-Purpose Files", 3),
+        markdown_cell("### Question 1.3: What time period is covered?"),
+        code_cell("# Question 1.3: What time period does the data cover?", 4),
+        code_cell("# Phase 4: Summary and Updated Hypotheses", 5),
+        markdown_cell("## 2. Exploring the Core Patterns"),
+        code_cell("# Question 2.1: What specific onboarding challenges appear?", 6),
+        code_cell("# Question 2.2: What are the 6 core categories?", 7),
+        code_cell("# Question 2.3: What type of education dominates?", 8),
+        markdown_cell("### Question 2.4: Production patterns"),
+        code_cell("# Question 2.4: What production patterns exist?", 9),
+        markdown_cell("## 3. Looking for Relationships"),
+        markdown_cell("### Question 3.1: Onboarding challenge clusters"),
+        code_cell("# Question 3.1: Do certain onboarding challenge types cluster?", 10),
+        markdown_cell("### Question 3.2: Learning progression"),
+        code_cell("# Question 3.2: Is there a progression in the material?", 11),
+        markdown_cell("### Question 3.3: Engagement"),
+        code_cell("# Question 3.3: Which categories generate engagement?", 12),
+        markdown_cell("## Section 4: Business Impact"),
+        markdown_cell("### Question 4.1"),
+        code_cell("business_value_onboarding = {}", 13),
+        markdown_cell("### Question 4.2"),
+        code_cell("production_gap_cost = {}", 14),
+        markdown_cell("### Question 4.3"),
+        code_cell("roi_analysis = {}", 15),
+        markdown_cell("## 5. Analysis Results"),
+        code_cell("hypothesis_results = {}", 16),
+        code_cell("key_discoveries = []", 17),
+        code_cell("recommendations = ['IMMEDIATE: ship']", 18),
+        code_cell("future_investigations = []", 19),
+        markdown_cell("## Executive Summary"),
+        code_cell("executive_summary = {'status': 'done'}", 20),
+    ]
+    filler = max(0, cell_count - len(cells))
+    for i in range(filler):
+        cells.append(markdown_cell(f"Working notes {i}") if i % 2 else code_cell(f"scratch_{i} = {i}", 100 + i))
+    return {"cells": cells, "metadata": generate_notebook(0, random.Random(0))["metadata"],
+            "nbformat": 4, "nbformat_minor": 5}
+
+
+def prepare_workdir(workdir, config, seed):
+    """Generate (or reuse) the synthetic corpus for a configuration"""
+    marker = workdir / "corpus.json"
+    if marker.exists() and json.loads(marker.read_text()) == config:
+        return
+    if workdir.exists():
+        raise SystemExit(f"❌ {workdir} holds a different corpus; remove it or pass --workdir")
+
+    rng = random.Random(seed)
+    print(f"🏗️  Generating corpus in {workdir} ...")
+    generate_ecosystem(workdir / "ecosystem", config["files"], rng)
+    generate_notebook_corpus(workdir / "notebooks", config["notebooks"],
+                             config["min_cells"], config["max_cells"], rng)
+    fix_template = workdir / "fix-notebook-template.ipynb"
+    with open(fix_template, "w") as f:
+        json.dump(generate_fix_notebook(config["max_cells"]), f, indent=1)
+    marker.write_text(json.dumps(config))
+
+
+# --- Timing -----------------------------------------------------------------
+
+def time_operation(func, repeat, setup=None):
+    """Run func `repeat` times (after optional setup each time) and return the timings"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def build_operations(workdir):
+    """Map of benchmark name -> (function, setup) over the generated corpus"""
+    operations = {}
+    ecosystem = workdir / "ecosystem"
+    notebooks = sorted((workdir / "notebooks").glob("*.ipynb"))
+
+    try:
+        sys.path.insert(0, str(TOOLS_DIR))
+        from ecosystem_categorizer import EcosystemCategorizer
+        categorizer = EcosystemCategorizer(api_key="benchmark")
+        operations["categorizer.scan_directory"] = (
+            lambda: categorizer.scan_directory(str(ecosystem / "anthropic-courses")), None)
+        operations["categorizer.categorize_cookbook"] = (
+            lambda: categorizer.categorize_cookbook(str(ecosystem / "anthropic-cookbook")), None)
+        operations["categorizer.generate_report"] = (
+            lambda: categorizer.generate_report(str(ecosystem)), None)
+    except ImportError as e:
+        print(f"⚠️  Skipping categorizer benchmarks ({e})")
+
+    validator = load_script("validate-notebooks.py", "validate_notebooks")
+    preparer = load_script("notebook-prepare.py", "notebook_prepare")
+    operations["validate-notebooks.validate_notebook"] = (
+        lambda: [validator.validate_notebook(nb) for nb in notebooks], None)
+    operations["notebook-prepare.validate_notebook_structure"] = (
+        lambda: [preparer.validate_notebook_structure(nb) for nb in notebooks], None)
+
+    # The fix scripts rewrite a fixed relative path, so run them inside the workdir
+    fix_dir = workdir / "fix-run"
+    target = fix_dir / FIX_NOTEBOOK_PATH
+    template = (workdir / "fix-notebook-template.ipynb").read_bytes()
+
+    def reset_fix_notebook():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(template)
+
+    def in_fix_dir(func):
+        def run():
+            previous = os.getcwd()
+            os.chdir(fix_dir)
+            try:
+                func()
+            finally:
+                os.chdir(previous)
+        return run
+
+    structure = load_script("fix-notebook-structure.py", "fix_notebook_structure")
+    final = load_script("fix-notebook-final.py", "fix_notebook_final")
+    operations["fix-notebook-structure.fix_notebook"] = (in_fix_dir(structure.fix_notebook), reset_fix_notebook)
+    operations["fix-notebook-final.fix_notebook_structure"] = (
+        in_fix_dir(final.fix_notebook_structure), reset_fix_notebook)
+
+    operations.update(build_execution_operations(workdir, notebooks))
+    return operations
+
+
+def build_execution_operations(workdir, notebooks):
+    """nbconvert subprocess vs warm kernel pool on copies of the smallest notebooks"""
+    execution = load_script("notebook_execution.py", "notebook_execution")
+    if shutil.which("jupyter-nbconvert") is None:
+        print("⚠️  Skipping execution benchmarks (jupyter-nbconvert not installed)")
+        return {}
+
+    source = sorted(notebooks, key=lambda nb: nb.stat().st_size)[:EXECUTION_NOTEBOOKS]
+    run_dir = workdir / "exec-run"
+    history_path = run_dir / "runtimes.json"
+
+    def reset_copies():
+        shutil.rmtree(run_dir, ignore_errors=True)
+        run_dir.mkdir(parents=True)
+        for nb in source:
+            shutil.copy(nb, run_dir / nb.name)
+
+    def execute(runner):
+        copies = sorted(run_dir.glob("*.ipynb"))
+        results = execution.execute_notebooks(copies, jobs=1, runner=runner,
+                                              history=execution.RuntimeHistory(history_path))
+        failed = [str(nb) for nb, status in results.items() if status != "ok"]
+        if failed:
+            raise RuntimeError(f"execution failed: {failed}")
+
+    def kernel_pool():
+        # Pool startup is part of the measured cost, as in notebook-prepare.py
+        with execution.KernelPool(1) as pool:
+            execute(pool.run)
+
+    operations = {"notebook-execution.nbconvert": (lambda: execute(execution.run_nbconvert), reset_copies)}
+    try:
+        import nbclient  # noqa: F401
+        operations["notebook-execution.kernel-pool"] = (kernel_pool, reset_copies)
+    except ImportError:
+        print("⚠️  Skipping kernel-pool benchmark (nbclient not installed)")
+    return operations
+
+
+# --- History and regressions -------------------------------------------------
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def load_history(history_file):
+    if not history_file.exists():
+        return []
+    with open(history_file) as f:
+        return json.load(f)
+
+
+def find_regressions(history, config, results, threshold, window):
+    """Compare each median with the median of the last `window` runs on the same corpus"""
+    previous = [run for run in history if run["config"] == config][-window:]
+    regressions = []
+    for name, result in results.items():
+        baseline_runs = [run["results"][name]["median"] for run in previous if name in run["results"]]
+        if not baseline_runs:
+            continue
+        baseline = statistics.median(baseline_runs)
+        if baseline > 0 and result["median"] > baseline * (1 + threshold):
+            regressions.append((name, baseline, result["median"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the categorizer and notebook tooling")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Corpus size preset")
+    parser.add_argument("--files", type=int, help="Override number of files in the synthetic tree")
+    parser.add_argument("--notebooks", type=int, help="Override number of notebooks")
+    parser.add_argument("--min-cells", type=int, help="Override smallest notebook size")
+    parser.add_argument("--max-cells", type=int, help="Override largest notebook size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", help="Run only benchmarks whose name contains one of these")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown versus the historical median (0.25 = 25%%)")
+    parser.add_argument("--window", type=int, default=5, help="Number of previous runs in the baseline")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="JSON history file")
+    parser.add_argument("--workdir", type=Path, help="Where the synthetic corpus is generated and reused")
+    parser.add_argument("--no-record", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for corpus generation")
+    args = parser.parse_args()
+
+    config = dict(SCALES[args.scale])
+    for key in ("files", "notebooks", "min_cells", "max_cells"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    workdir = args.workdir or DEFAULT_WORKDIR / "-".join(f"{k}{v}" for k, v in sorted(config.items()))
+
+    print("⏱️  Benchmark suite")
+    print("=" * 60)
+    print(f"Corpus: {config}")
+    prepare_workdir(workdir, config, args.seed)
+
+    operations = build_operations(workdir)
+    if args.only:
+        operations = {name: op for name, op in operations.items() if any(o in name for o in args.only)}
+
+    results = {}
+    for name, (func, setup) in operations.items():
+        timings = time_operation(func, args.repeat, setup)
+        results[name] = {"median": statistics.median(timings), "min": min(timings), "runs": timings}
+        print(f"  {name:<48} {results[name]['median']:>9.4f}s (min {results[name]['min']:.4f}s)")
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, config, results, args.threshold, args.window)
+
+    if not args.no_record:
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "config": config,
+            "results": results,
+        })
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+        print(f"\n📝 Recorded in {args.history}")
+
+    print("\n" + "=" * 60)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for name, baseline, current in regressions:
+            print(f"   - {name}: {baseline:.4f}s -> {current:.4f}s ({current / baseline - 1:+.0%})")
+        sys.exit(1)
+    print("✅ No regressions against recorded history")
+
+
+if __name__ == "__main__":
+    main()
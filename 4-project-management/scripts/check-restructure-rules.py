@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Check the restructure rule files against the hand-written scripts they replaced
+
+The original fix-notebook-structure.py and fix-notebook-final.py elif
+chains are kept here as reference implementations. Both are run on
+shuffled and mutated copies of the benchmark's Scenario 1 notebook, and
+the cell order each produces must match what the rule file lays out (or
+both must reject the notebook for a missing required section).
+
+Usage:
+    python check-restructure-rules.py
+    python check-restructure-rules.py --notebooks 5000 --seed 7
+"""
+
+import argparse
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+from notebook_restructure import RestructureError, RuleSet, default_rules_path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Pattern fragments spliced into random cells to hit overlaps between rules
+MUTATIONS = ["Hypothesis Testing", "Hypothesis Testing Results", "key_discoveries", "Key Discoveries",
+             "future_investigations", "Areas for Future", "recommendations", "IMMEDIATE",
+             "Question 3.1", "CHALLENGE", "QUESTION 2.2", "### Question 4.2", "roi_analysis",
+             "## 5. Analysis Results", "executive_summary = {", "Code to analyze"]
+
+
+def _source(cell):
+    return ''.join(cell.get('source', []))
+
+
+def legacy_structure_order(cells):
+    """Reference implementation: the original fix-notebook-structure.py chain"""
+    cells_map = {}
+    for i, cell in enumerate(cells):
+        source = _source(cell)
+        code = cell['cell_type'] == 'code'
+        if 'Scenario 1 Deep Dive Analysis - Iteration 1' in source:
+            cells_map['title'] = i
+        elif '## 1. Understanding Our Measurements' in source:
+            cells_map['section1'] = i
+        elif '## 2. Exploring the Core Patterns' in source:
+            cells_map['section2'] = i
+        elif '## 3. Looking for Relationships' in source:
+            cells_map['section3'] = i
+        elif '## Section 4: Business Impact' in source:
+            cells_map['section4'] = i
+        elif '## 5. Analysis Results' in source:
+            cells_map['section5'] = i
+        elif '## Executive Summary' in source:
+            cells_map['exec_summary'] = i
+        elif '### Question 1.1' in source:
+            cells_map['q1.1_md'] = i
+        elif 'Question 1.1' in source and 'calculate these percentages' in source and code:
+            cells_map['q1.1_code'] = i
+        elif '### Question 1.2' in source:
+            cells_map['q1.2_md'] = i
+        elif 'Phase 1: Understanding the Categorization Tool' in source:
+            cells_map['q1.2_code1'] = i
+        elif 'Phase 2: Identifying Multi-Purpose Files' in source:
+            cells_map['q1.2_code2'] = i
+        elif '### Question 1.3' in source:
+            cells_map['q1.3_md'] = i
+        elif 'Question 1.3: What time period' in source and code:
+            cells_map['q1.3_code1'] = i
+        elif 'Phase 4: Summary and Updated Hypotheses' in source:
+            cells_map['q1.3_code2'] = i
+        elif 'Question 2.1: What specific onboarding' in source and code:
+            cells_map['q2.1_code'] = i
+        elif 'Question 2.2: What are the 6 core' in source and code:
+            cells_map['q2.2_code'] = i
+        elif 'Question 2.3: What type of education' in source and code:
+            cells_map['q2.3_code'] = i
+        elif '### Question 2.4' in source:
+            cells_map['q2.4_md'] = i
+        elif 'Question 2.4: What production patterns' in source and code:
+            cells_map['q2.4_code'] = i
+        elif '### Question 3.1' in source:
+            cells_map['q3.1_md'] = i
+        elif 'Question 3.1: Do certain onboarding' in source and code:
+            cells_map['q3.1_code'] = i
+        elif '### Question 3.2' in source:
+            cells_map['q3.2_md'] = i
+        elif 'Question 3.2: Is there a progression' in source and code:
+            cells_map['q3.2_code'] = i
+        elif '### Question 3.3' in source:
+            cells_map['q3.3_md'] = i
+        elif 'Question 3.3: Which categories generate' in source and code:
+            cells_map['q3.3_code'] = i
+        elif '### Question 4.1' in source:
+            cells_map['q4.1_md'] = i
+        elif 'business_value_onboarding' in source and code:
+            cells_map['q4.1_code'] = i
+        elif '### Question 4.2' in source:
+            cells_map['q4.2_md'] = i
+        elif 'production_gap_cost' in source and code:
+            cells_map['q4.2_code'] = i
+        elif '### Question 4.3' in source:
+            cells_map['q4.3_md'] = i
+        elif 'roi_analysis' in source and code:
+            cells_map['q4.3_code'] = i
+        elif 'executive_summary = {' in source:
+            cells_map['exec_code'] = i
+
+    # Inserted cells (the Q2.1-2.3 headers) are compared as 'header'
+    order = [cells_map['title'], cells_map['section1']]
+    order += [cells_map[s] for s in ('q1.1_md', 'q1.1_code', 'q1.2_md', 'q1.2_code1', 'q1.2_code2',
+                                     'q1.3_md', 'q1.3_code1', 'q1.3_code2') if s in cells_map]
+    order.append(cells_map['section2'])
+    for slot in ('q2.1_code', 'q2.2_code', 'q2.3_code'):
+        order.append('header')
+        order += [cells_map[slot]] if slot in cells_map else []
+    order += [cells_map[s] for s in ('q2.4_md', 'q2.4_code') if s in cells_map]
+    order.append(cells_map['section3'])
+    order += [cells_map[s] for s in ('q3.1_md', 'q3.1_code', 'q3.2_md', 'q3.2_code',
+                                     'q3.3_md', 'q3.3_code') if s in cells_map]
+    order.append(cells_map['section4'])
+    order += [cells_map[s] for s in ('q4.1_md', 'q4.1_code', 'q4.2_md', 'q4.2_code',
+                                     'q4.3_md', 'q4.3_code') if s in cells_map]
+    order += [cells_map[s] for s in ('section5', 'exec_summary', 'exec_code') if s in cells_map]
+    return order
+
+
+def legacy_final_order(cells):
+    """Reference implementation: the original fix-notebook-final.py passes"""
+    found = {'title': None, 'exec_summary': None}
+    sections = {f'section{n}': {'header': None, 'content': []} for n in range(1, 6)}
+    exec_content = []
+    for i, cell in enumerate(cells):
+        source = _source(cell)
+        if 'Scenario 1 Deep Dive Analysis - Iteration 1' in source:
+            found['title'] = i
+        elif '## 1. Understanding Our Measurements' in source:
+            sections['section1']['header'] = i
+        elif '## 2. Exploring the Core Patterns' in source:
+            sections['section2']['header'] = i
+        elif '## 3. Looking for Relationships' in source:
+            sections['section3']['header'] = i
+        elif '## Section 4: Business Impact' in source:
+            sections['section4']['header'] = i
+        elif '## 5. Analysis Results' in source:
+            sections['section5']['header'] = i
+        elif '## Executive Summary' in source:
+            found['exec_summary'] = i
+        elif ('Question 1.1' in source or 'Question 1.2' in source or 'Phase 1: Understanding' in source
+              or 'Phase 2: Identifying' in source or 'Question 1.3' in source or 'Phase 4: Summary' in source):
+            sections['section1']['content'].append(i)
+        elif any(f'Question 2.{n}' in source for n in range(1, 5)) or any(
+                f'QUESTION 2.{n}' in source for n in range(1, 4)):
+            sections['section2']['content'].append(i)
+        elif (('Question 3.1' in source and 'challenge' in source.lower())
+              or ('Question 3.2' in source and 'progression' in source.lower())
+              or ('Question 3.3' in source and 'engagement' in source.lower())):
+            sections['section3']['content'].append(i)
+        elif any(p in source for p in ('Question 4.1', 'business_value_onboarding', 'Question 4.2',
+                                       'production_gap_cost', 'Question 4.3', 'roi_analysis')):
+            sections['section4']['content'].append(i)
+        elif ('hypothesis_results' in source or 'Hypothesis Testing Results' in source
+              or 'key_discoveries' in source or 'Key Discoveries' in source
+              or ('recommendations' in source and 'IMMEDIATE' in source)
+              or 'future_investigations' in source or 'Areas for Future' in source):
+            sections['section5']['content'].append(i)
+        elif 'executive_summary = {' in source:
+            exec_content.append(i)
+
+    order = [found['title']] if found['title'] is not None else []
+    for n in range(1, 5):
+        section = sections[f'section{n}']
+        if section['header'] is not None:
+            order += [section['header']] + sorted(section['content'])
+    order.append('header')
+
+    # Second pass: the looser 'Hypothesis Testing' match
+    section5_order = []
+    for idx in sections['section5']['content']:
+        source = _source(cells[idx])
+        if 'hypothesis_results' in source or 'Hypothesis Testing' in source:
+            section5_order.append(('hypothesis', idx))
+        elif 'key_discoveries' in source or 'Key Discoveries' in source:
+            section5_order.append(('discoveries', idx))
+        elif 'recommendations' in source and 'IMMEDIATE' in source:
+            section5_order.append(('recommendations', idx))
+        elif 'future_investigations' in source or 'Areas for Future' in source:
+            section5_order.append(('future', idx))
+    type_order = {'hypothesis': 1, 'discoveries': 2, 'recommendations': 3, 'future': 4}
+    section5_order.sort(key=lambda x: type_order.get(x[0], 99))
+    order += [idx for _, idx in section5_order]
+
+    if found['exec_summary'] is not None:
+        order += [found['exec_summary']] + exec_content
+    return order
+
+
+CHECKS = {"scenario1-structure": legacy_structure_order, "scenario1-final": legacy_final_order}
+
+
+def rule_order(rules, cells):
+    """Cell order from the rule file, with inserted cells shown as 'header'"""
+    return [item if isinstance(item, int) else 'header' for item in rules.layout(rules.classify(cells))]
+
+
+def mutated_cells(template, rng):
+    """Shuffled copy of the template cells with pattern fragments spliced in"""
+    cells = [dict(cell) for cell in template]
+    rng.shuffle(cells)
+    for _ in range(rng.randint(0, 8)):
+        cell = rng.choice(cells)
+        cell['source'] = list(cell['source']) + [" " + rng.choice(MUTATIONS)]
+        if rng.random() < 0.3:
+            cell['cell_type'] = rng.choice(["code", "markdown"])
+    for _ in range(rng.choice([0, 0, 0, 1, 2])):
+        del cells[rng.randrange(len(cells))]
+    return cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check rule files against the original fix scripts")
+    parser.add_argument("--notebooks", type=int, default=1000, help="Random notebooks per rule file")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    spec = importlib.util.spec_from_file_location("benchmark_suite", SCRIPTS_DIR / "benchmark-suite.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    template = bench.generate_fix_notebook(60)["cells"]
+
+    failed = False
+    for name, legacy in CHECKS.items():
+        rules = RuleSet.load(default_rules_path(name))
+        rng = random.Random(args.seed)
+        mismatches = 0
+        for trial in range(args.notebooks):
+            cells = mutated_cells(template, rng)
+            try:
+                expected = legacy(cells)
+            except KeyError:
+                expected = "missing required slot"
+            try:
+                actual = rule_order(rules, cells)
+            except RestructureError:
+                actual = "missing required slot"
+            if actual != expected:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"  notebook {trial}: expected {expected}\n    got {actual}")
+        status = "✅" if not mismatches else "❌"
+        print(f"{status} {name}: {args.notebooks - mismatches}/{args.notebooks} notebooks match the original script")
+        failed = failed or bool(mismatches)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
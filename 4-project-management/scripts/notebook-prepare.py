@@ -8,84 +8,124 @@ for correct rendering on GitHub.
 Usage:
     python notebook-prepare.py path/to/notebook.ipynb
     python notebook-prepare.py --all  # Process all notebooks
+    python notebook-prepare.py --all --validate-only --no-cache
+    python notebook-prepare.py --staged --validate-only  # pre-commit: staged notebooks only
+    python notebook-prepare.py --all --jobs 4 --timeout 120
+    python notebook-prepare.py --all --backend kernel-pool  # warm in-process kernels
+    python notebook-prepare.py --all --force  # re-execute even if code is unchanged
+    python notebook-prepare.py path/to/notebook.ipynb --incremental  # only changed cells + dependents
 """
 
 import argparse
-import subprocess
+import os
 import sys
-import json
 from pathlib import Path
 
+from notebook_cache import ValidationCache
+from notebook_discovery import GitUnavailable, find_changed_notebooks, walk_notebooks
+from notebook_execution import (DEFAULT_TIMEOUT, FreshnessCheck, KernelPool, RuntimeHistory,
+                                execute_notebooks, run_nbconvert)
+from notebook_pipeline import ExecutionAudit, FormatCheck, NotebookPipeline
+
+# Editing any of these invalidates the validation cache
+VALIDATOR_SOURCES = [Path(__file__), Path(__file__).with_name("notebook_stream.py"),
+                     Path(__file__).with_name("notebook_pipeline.py")]
+
+VALIDATION_PASSES = [FormatCheck(), ExecutionAudit()]
+
 
 def validate_notebook_structure(notebook_path):
     """Validate notebook has required structure."""
-    with open(notebook_path, 'r') as f:
-        nb = json.load(f)
-    
+    results, _ = NotebookPipeline(VALIDATION_PASSES).run(notebook_path)
+    return structure_issues(results)
+
+
+def structure_issues(results):
+    """Word the validation pass results as issues."""
     issues = []
+    fmt = results["format"]
     
     # Check format version
-    if 'nbformat' not in nb:
+    if not fmt["has_nbformat"]:
         issues.append("Missing nbformat version")
     
     # Check for kernel spec
-    if 'metadata' not in nb or 'kernelspec' not in nb.get('metadata', {}):
+    if fmt["metadata_keys"] is None or 'kernelspec' not in fmt["metadata_keys"]:
         issues.append("Missing kernel specification")
     
     # Check for unexecuted code cells
-    unexecuted = 0
-    for i, cell in enumerate(nb.get('cells', [])):
-        if cell.get('cell_type') == 'code':
-            if cell.get('execution_count') is None:
-                unexecuted += 1
-    
+    unexecuted = results["execution"]["unexecuted"]
     if unexecuted > 0:
         issues.append(f"{unexecuted} unexecuted code cells found")
     
     return issues
 
 
-def execute_notebook(notebook_path):
+def execute_notebook(notebook_path, timeout=DEFAULT_TIMEOUT):
     """Execute notebook using jupyter-nbconvert."""
     print(f"📓 Executing {notebook_path}...")
-    
-    cmd = [
-        "jupyter-nbconvert",
-        "--to", "notebook",
-        "--execute",
-        "--inplace",
-        "--ExecutePreprocessor.timeout=60",
-        str(notebook_path)
-    ]
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(f"✅ Successfully executed {notebook_path}")
+    deadline = RuntimeHistory().notebook_timeout(notebook_path, timeout)
+    status, seconds, detail = run_nbconvert(notebook_path, timeout, deadline)
+    return report_execution(notebook_path, status, seconds, detail)
+
+
+def report_execution(notebook_path, status, seconds, detail):
+    """Print the outcome of one execution; returns True on success."""
+    if status == "ok":
+        note = f", {detail}" if detail else ""
+        print(f"✅ Successfully executed {notebook_path} ({seconds:.1f}s{note})")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error executing {notebook_path}:")
-        print(e.stderr)
-        return False
-    except FileNotFoundError:
+    if status == "missing":
         print("❌ jupyter-nbconvert not found. Install with: pip install jupyter nbconvert")
-        return False
+    elif status == "timeout":
+        print(f"⏱️  Timed out executing {notebook_path}: {detail}")
+    else:
+        print(f"❌ Error executing {notebook_path}:")
+        print(detail)
+    return False
 
 
 def find_all_notebooks(root_path="."):
     """Find all notebook files in the repository."""
-    root = Path(root_path)
-    return list(root.glob("**/*.ipynb"))
+    # .git, node_modules, checkpoints and build directories are pruned
+    return walk_notebooks(root_path)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Prepare Jupyter notebooks for commit")
     parser.add_argument("notebook", nargs="?", help="Path to notebook file")
     parser.add_argument("--all", action="store_true", help="Process all notebooks")
+    parser.add_argument("--changed", nargs="?", const="HEAD", metavar="REF",
+                        help="Process notebooks changed relative to REF (default HEAD), plus untracked ones")
+    parser.add_argument("--staged", action="store_true", help="Process notebooks staged in the git index")
     parser.add_argument("--validate-only", action="store_true", help="Only validate, don't execute")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-validate every notebook, ignoring .cache/notebook-validation")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Execute N notebooks at once (default: one per CPU core)")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT,
+                        help="Per-cell timeout in seconds; each notebook as a whole may take "
+                             "3x its recorded runtime, and at least 10 minutes")
+    parser.add_argument("--backend", choices=["nbconvert", "kernel-pool"], default="nbconvert",
+                        help="nbconvert: one jupyter-nbconvert process per notebook; "
+                             "kernel-pool: execute in-process on reused warm kernels (needs nbclient)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-execute only changed code cells and the cells depending on them "
+                             "(implies --backend kernel-pool)")
+    parser.add_argument("--force", action="store_true",
+                        help="Execute even notebooks whose code is unchanged since their last clean run")
     
     args = parser.parse_args()
     
-    if args.all:
+    if args.changed or args.staged:
+        try:
+            notebooks = find_changed_notebooks(ref=args.changed or "HEAD", staged=args.staged)
+            print(f"Found {len(notebooks)} changed notebooks")
+        except GitUnavailable as e:
+            print(f"⚠️  Git unavailable ({e}); processing all notebooks")
+            notebooks = find_all_notebooks()
+            print(f"Found {len(notebooks)} notebooks")
+    elif args.all:
         notebooks = find_all_notebooks()
         print(f"Found {len(notebooks)} notebooks")
     elif args.notebook:
@@ -95,6 +135,9 @@ def main():
         sys.exit(1)
     
     failed = []
+    cache = None if args.no_cache else ValidationCache("notebook-prepare", VALIDATOR_SOURCES)
+    
+    to_execute = []
     
     for notebook_path in notebooks:
         if not notebook_path.exists():
@@ -102,17 +145,59 @@ def main():
             failed.append(notebook_path)
             continue
         
-        # Validate structure
-        issues = validate_notebook_structure(notebook_path)
+        # Validate structure (unchanged notebooks are answered from the cache)
+        issues = cache.lookup(notebook_path) if cache else None
+        check_freshness = not args.validate_only and not args.force
+        
+        # Validation and the fingerprint check share one load and one cell pass
+        passes = (VALIDATION_PASSES if issues is None else []) + ([FreshnessCheck()] if check_freshness else [])
+        results = NotebookPipeline(passes).run(notebook_path)[0] if passes else {}
+        if issues is None:
+            issues = structure_issues(results)
+            if cache:
+                cache.store(notebook_path, issues)
         if issues:
             print(f"⚠️  Issues found in {notebook_path}:")
             for issue in issues:
                 print(f"   - {issue}")
         
-        # Execute if not validate-only
-        if not args.validate_only:
-            if not execute_notebook(notebook_path):
+        # Skip notebooks whose code cells match their execution fingerprint
+        if check_freshness and results["up_to_date"]:
+            print(f"⏭️  Skipping {notebook_path} (code unchanged since last clean execution)")
+            continue
+        
+        to_execute.append(notebook_path)
+    
+    if cache:
+        cache.save()
+    
+    # Execute if not validate-only: longest notebooks first, in parallel
+    if not args.validate_only and to_execute:
+        jobs = min(args.jobs or os.cpu_count() or 1, len(to_execute))
+        print(f"\n📓 Executing {len(to_execute)} notebooks with {jobs} worker(s)...")
+        
+        def on_result(notebook_path, status, seconds, detail):
+            if not report_execution(notebook_path, status, seconds, detail):
                 failed.append(notebook_path)
+        
+        pool = None
+        if args.backend == "kernel-pool" or args.incremental:
+            try:
+                pool = KernelPool(jobs)
+            except ImportError as e:
+                print(f"⚠️  kernel-pool backend unavailable ({e}); install with: pip install nbclient ipykernel")
+                print("   Falling back to full runs with jupyter-nbconvert")
+        
+        if pool:
+            runner = pool.run_incremental if args.incremental else pool.run
+        else:
+            runner = run_nbconvert
+        try:
+            execute_notebooks(to_execute, jobs=jobs, history=RuntimeHistory(), cell_timeout=args.timeout,
+                              runner=runner, on_result=on_result)
+        finally:
+            if pool:
+                pool.shutdown()
     
     # Summary
     print("\n" + "="*50)
@@ -0,0 +1,167 @@
+"""
+Persistent validation result cache for the notebook scripts.
+
+validate-notebooks.py and notebook-prepare.py re-parse every notebook on
+every run although most of them have not changed. ValidationCache keeps
+the issue list of each notebook in .cache/notebook-validation/<name>.json:
+
+    {"version": 1,
+     "validator": "<sha256 of the validator sources>",
+     "entries": {"/abs/path.ipynb": {"stat": [inode, mtime_ns, size],
+                                     "sha256": "...",
+                                     "issues": ["Missing kernelspec"]}}}
+
+Lookup is two-tiered. A matching (inode, mtime_ns, size) returns the
+stored issues without opening the file. Any other stat falls back to
+the content hash, which covers checkouts and `touch` that only bump
+mtimes. The file is hashed even when its size changed: the hash can't
+match then, but it goes into the entry stored after validating, where
+the next stat-only change needs it. A hit never parses the notebook.
+
+probe() does the file I/O of a lookup and needs only the entry, so
+validate-notebooks.py runs it in its worker processes and hands the
+result back to the cache with record().
+
+Invalidation:
+- Editing the validator (its source files) or bumping CACHE_VERSION
+  drops the whole cache.
+- A notebook modified within RACY_WINDOW_NS of being read is stored
+  without its stat, so a same-tick edit is caught by the hash check.
+- Entries for deleted notebooks are pruned on save.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(".cache") / "notebook-validation"
+# Coarse filesystem timestamps: mtimes this close to "now" can't be trusted
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash a file in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe(notebook_path, entry):
+    """Check a notebook against its cache entry (or None): (issues, state).
+
+    issues is the cached issue list, or None on a miss. state is what
+    ValidationCache.record() keeps: (stat, or None if racy, and sha256).
+    """
+    st = os.stat(notebook_path)
+    stat_key = [st.st_ino, st.st_mtime_ns, st.st_size]
+    if entry and entry.get("stat") == stat_key:
+        return entry["issues"], (stat_key, entry.get("sha256"))
+
+    digest = file_sha256(notebook_path)
+    racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+    stat_key = None if racy else stat_key
+    if entry and entry.get("sha256") == digest:
+        # Content unchanged; only the stat moved (checkout, touch)
+        return entry["issues"], (stat_key, digest)
+    return None, (stat_key, digest)
+
+
+def validator_fingerprint(source_files):
+    """Hash of the validator sources plus CACHE_VERSION"""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    for source in source_files:
+        digest.update(Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """Issue lists per notebook, keyed by stat with a content-hash fallback"""
+
+    def __init__(self, name, validator_files, cache_dir=DEFAULT_CACHE_DIR):
+        self.path = Path(cache_dir) / f"{name}.json"
+        self.validator = validator_fingerprint(validator_files)
+        self.entries = {}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("validator") == self.validator:
+            self.entries = data.get("entries", {})
+        else:
+            self.dirty = True
+
+    @staticmethod
+    def _key(notebook_path):
+        return str(Path(notebook_path).resolve())
+
+    def entry(self, notebook_path):
+        """The stored entry for a notebook, for probe(); None if there is none"""
+        return self.entries.get(self._key(notebook_path))
+
+    def lookup(self, notebook_path):
+        """Return the cached issue list, or None on a miss.
+
+        On a miss the file's stat and hash are remembered so that a later
+        store() records the state the notebook was validated in.
+        """
+        issues, state = probe(notebook_path, self.entry(notebook_path))
+        self.record(notebook_path, issues, state)
+        return issues
+
+    def record(self, notebook_path, issues, state):
+        """Account for a probe() of notebook_path, possibly made in another process"""
+        key = self._key(notebook_path)
+        if issues is None:
+            self.pending[key] = state
+            self.misses += 1
+            return
+        entry = self.entries[key]
+        stat_key = state[0]
+        if entry.get("stat") != stat_key:
+            entry["stat"] = stat_key
+            self.dirty = True
+        self.hits += 1
+
+    def store(self, notebook_path, issues):
+        """Record the issues for a notebook previously missed by lookup()"""
+        key = self._key(notebook_path)
+        if key not in self.pending:
+            return
+        stat_key, digest = self.pending.pop(key)
+        self.entries[key] = {"stat": stat_key, "sha256": digest, "issues": list(issues)}
+        self.dirty = True
+
+    def save(self):
+        """Prune deleted notebooks and write the cache atomically"""
+        stale = [key for key in self.entries if not os.path.exists(key)]
+        for key in stale:
+            del self.entries[key]
+        if not (self.dirty or stale):
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"version": CACHE_VERSION, "validator": self.validator,
+                           "entries": self.entries}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+    def summary(self):
+        return f"{self.hits} cached, {self.misses} validated"
@@ -0,0 +1,363 @@
+"""
+Static name dependencies between notebook code cells.
+
+Used by notebook-prepare.py --incremental to work out which cells of an
+already executed notebook must run again after an edit. Each code cell is
+parsed with ast and reduced to the names it defines and uses:
+
+    x = load()           defines {x}        uses {load}
+    x.append(1)          defines {x}        uses {x}     (mutating call)
+    df["a"] = f(df)      defines {df}       uses {df, f}
+    import numpy as np   defines {np}       modules {np}
+
+Function and lambda bodies run when called, not when defined, so the
+globals they read or mutate are kept apart as latent names:
+
+    def show():          defines {show}     latent uses {config}
+        print(config)
+
+Latent names pass to every name the cell defines (so `f = show` or
+`obj = Cls()` carry them along), and a cell that uses such a name counts
+as reading and mutating them too: `show()` reads config.
+
+plan_reexecution() then splits the cells into:
+
+- dirty:  changed cells, plus every later cell that reads or mutates a
+          name a dirty cell defined. These run and get new outputs.
+- replay: earlier clean cells that produce state the dirty cells read.
+          They run silently to rebuild the kernel namespace; their
+          cached outputs are kept.
+
+Every other cell keeps its cached outputs without running.
+
+Cells ast can't parse (IPython magics, shell escapes) or that star-import
+are opaque. They are assumed to define and use everything: an opaque
+dirty cell makes all later cells dirty, and an opaque cell before a
+dirty one is always replayed along with everything it depends on.
+Hidden state behind module names (e.g. seeding np.random in one cell and
+drawing in another) is not tracked; use a full run when that matters.
+"""
+
+import ast
+
+
+class CellNames:
+    """Names one code cell defines, uses and binds by import"""
+
+    def __init__(self, defines=(), uses=(), modules=(), opaque=False,
+                 latent_uses=(), latent_defines=()):
+        self.defines = set(defines)
+        self.uses = set(uses)
+        self.modules = set(modules)
+        self.opaque = opaque
+        # Globals read / mutated by function bodies defined in the cell
+        self.latent_uses = set(latent_uses)
+        self.latent_defines = set(latent_defines)
+
+    def __repr__(self):
+        if self.opaque:
+            return "CellNames(opaque)"
+        return f"CellNames(defines={sorted(self.defines)}, uses={sorted(self.uses)})"
+
+
+def _root_name(node):
+    """x for x, x.a, x[0].b(...) and so on; None for anything else"""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _visit_signature(visitor, node):
+    """Visit what a def or lambda evaluates when defined: decorators, defaults, annotations"""
+    for child in getattr(node, "decorator_list", ()):
+        visitor.visit(child)
+    args = node.args
+    for child in args.defaults + [d for d in args.kw_defaults if d is not None]:
+        visitor.visit(child)
+    for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+        if arg is not None and arg.annotation is not None:
+            visitor.visit(arg.annotation)
+    if getattr(node, "returns", None) is not None:
+        visitor.visit(node.returns)
+
+
+class _ScopeCollector(ast.NodeVisitor):
+    """Free globals one function body reads and mutates when it runs"""
+
+    def __init__(self, node):
+        self.loads = set()
+        self.stores = set()
+        self.mutated = set()
+        self.declared = set()
+        self.global_names = set()
+        args = node.args
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self.stores.add(arg.arg)
+        body = node.body if isinstance(node.body, list) else [node.body]
+        for statement in body:
+            self.visit(statement)
+
+    def free_names(self):
+        """(reads, writes) of names the body does not bind locally"""
+        local = self.stores - self.declared
+        writes = (self.mutated - local) | (self.stores & self.global_names)
+        return self.loads - local, writes
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.loads.add(node.id)
+        else:
+            self.stores.add(node.id)
+
+    def _mutate_root(self, target):
+        if isinstance(target, (ast.Attribute, ast.Subscript)):
+            root = _root_name(target)
+            if root:
+                self.mutated.add(root)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self._mutate_root(target)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self._mutate_root(node.target)
+        if isinstance(node.target, ast.Name):
+            self.loads.add(node.target.id)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        self._mutate_root(node.target)
+        self.generic_visit(node)
+
+    def visit_Delete(self, node):
+        for target in node.targets:
+            self._mutate_root(target)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute):
+            self._mutate_root(node.func)
+        self.generic_visit(node)
+
+    def visit_Global(self, node):
+        self.declared.update(node.names)
+        self.global_names.update(node.names)
+
+    def visit_Nonlocal(self, node):
+        # Bound in an enclosing function, which sorts it out
+        self.declared.update(node.names)
+
+    def _visit_nested(self, node):
+        _visit_signature(self, node)
+        reads, writes = _ScopeCollector(node).free_names()
+        self.loads |= reads
+        self.mutated |= writes
+
+    def _visit_nested_definition(self, node):
+        self.stores.add(node.name)
+        self._visit_nested(node)
+
+    visit_FunctionDef = _visit_nested_definition
+    visit_AsyncFunctionDef = _visit_nested_definition
+    visit_Lambda = _visit_nested
+
+    def visit_ClassDef(self, node):
+        self.stores.add(node.name)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.stores.add(alias.asname or alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.stores.add(alias.asname or alias.name)
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self.stores.add(node.name)
+        self.generic_visit(node)
+
+
+class _NameCollector(ast.NodeVisitor):
+    def __init__(self):
+        self.names = CellNames()
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.names.uses.add(node.id)
+        else:
+            self.names.defines.add(node.id)
+
+    def _define_root(self, target):
+        # x.attr = ..., x[key] = ..., del x[key] mutate x
+        if isinstance(target, (ast.Attribute, ast.Subscript)):
+            root = _root_name(target)
+            if root:
+                self.names.defines.add(root)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self._define_root(target)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self._define_root(node.target)
+        if isinstance(node.target, ast.Name):
+            self.names.uses.add(node.target.id)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        self._define_root(node.target)
+        self.generic_visit(node)
+
+    def visit_Delete(self, node):
+        for target in node.targets:
+            self._define_root(target)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        # Method calls may mutate their receiver: x.append(1), df.drop(..., inplace=True)
+        if isinstance(node.func, ast.Attribute):
+            root = _root_name(node.func)
+            if root:
+                self.names.defines.add(root)
+        self.generic_visit(node)
+
+    def _visit_function(self, node):
+        # Only the signature runs now; the body's globals are latent
+        _visit_signature(self, node)
+        reads, writes = _ScopeCollector(node).free_names()
+        self.names.latent_uses |= reads
+        self.names.latent_defines |= writes
+
+    def _visit_function_definition(self, node):
+        self.names.defines.add(node.name)
+        self._visit_function(node)
+
+    visit_FunctionDef = _visit_function_definition
+    visit_AsyncFunctionDef = _visit_function_definition
+    visit_Lambda = _visit_function
+
+    def visit_ClassDef(self, node):
+        # A class body runs immediately; its methods are latent
+        self.names.defines.add(node.name)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self.names.defines.add(name)
+            self.names.modules.add(name)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name == "*":
+                self.names.opaque = True
+                continue
+            self.names.defines.add(alias.asname or alias.name)
+
+
+def analyze_cell(source):
+    """Reduce a code cell's source to its CellNames"""
+    if isinstance(source, list):
+        source = "".join(source)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return CellNames(opaque=True)
+    collector = _NameCollector()
+    collector.visit(tree)
+    return collector.names
+
+
+def _latent_names(cells):
+    """name -> (reads, writes) that calling or using the name may trigger.
+
+    Each cell passes its own latent names, and those of every name it
+    uses, to every name it defines; repeated until nothing changes.
+    """
+    latent = {}
+    changed = True
+    while changed:
+        changed = False
+        for cell in cells:
+            if cell.opaque:
+                continue
+            reads, writes = set(cell.latent_uses), set(cell.latent_defines)
+            for name in cell.uses | cell.latent_uses:
+                if name in latent:
+                    reads |= latent[name][0]
+                    writes |= latent[name][1]
+            if not reads and not writes:
+                continue
+            for name in cell.defines:
+                entry = latent.setdefault(name, (set(), set()))
+                if not (reads <= entry[0] and writes <= entry[1]):
+                    entry[0].update(reads)
+                    entry[1].update(writes)
+                    changed = True
+    return latent
+
+
+def plan_reexecution(sources, changed):
+    """Split code cells into (dirty, replay) index sets.
+
+    sources: code-cell sources in notebook order
+    changed: indices (into sources) whose cached outputs can't be trusted
+
+    Calling a function re-runs it when a global its body reads changed:
+
+    >>> plan_reexecution(['def show(): print("config =", config)',
+    ...                   'config = 3', 'other = 5', 'show()'], {1})
+    ({1, 3}, {0})
+    """
+    cells = [analyze_cell(source) for source in sources]
+    modules = set().union(*(cell.modules for cell in cells))
+    latent = _latent_names(cells)
+    uses = []
+    defines = []
+    for cell in cells:
+        cell_uses, cell_defines = set(cell.uses), set(cell.defines)
+        for name in cell.uses:
+            if name in latent:
+                cell_uses |= latent[name][0]
+                cell_defines |= latent[name][1]
+        uses.append(cell_uses)
+        # A module is only defined where it is imported; np.zeros() elsewhere
+        # must not look like a mutation of np
+        defines.append(cell_defines - (modules - cell.modules))
+
+    # Forward pass: cells whose outputs may differ from the cached run.
+    # `touched` holds names whose value differs at this point.
+    dirty = set()
+    touched = set()
+    everything = False
+    for index, cell in enumerate(cells):
+        reads_touched = bool(touched) if cell.opaque else bool(uses[index] & touched)
+        if index in changed or everything or reads_touched:
+            dirty.add(index)
+            everything = everything or cell.opaque
+            touched |= defines[index]
+        else:
+            # A clean cell recomputes its names exactly as in the cached run
+            touched -= defines[index]
+
+    # Backward pass: clean cells producing names the executed cells read.
+    # None means "everything" (opaque consumer).
+    replay = set()
+    needed = {index: None if cells[index].opaque else uses[index] for index in dirty}
+    pending = sorted(dirty)
+    while pending:
+        consumer = pending.pop()
+        names = needed[consumer]
+        for producer in range(consumer):
+            if producer in dirty or producer in replay:
+                continue
+            if cells[producer].opaque or names is None or defines[producer] & names:
+                replay.add(producer)
+                needed[producer] = None if cells[producer].opaque else uses[producer]
+                pending.append(producer)
+    return dirty, replay
@@ -0,0 +1,83 @@
+"""
+Notebook discovery for the notebook scripts.
+
+walk_notebooks() replaces Path.glob("**/*.ipynb"): it walks with
+os.walk and prunes .git, node_modules and other tool directories before
+descending into them, instead of filtering matches afterwards.
+
+find_changed_notebooks() asks git for just the notebooks a commit would
+touch, so pre-commit cost scales with the diff instead of the tree:
+
+    staged=True        git diff --cached --name-only   (the index)
+    ref="origin/main"  git diff --name-only origin/main
+                       + git ls-files --others         (new, untracked)
+
+Each listing is one batched git call filtered to *.ipynb by pathspec.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+# Never descended into while walking; also filtered out of git listings
+PRUNED_DIRS = {
+    ".git", "node_modules", ".ipynb_checkpoints", "__pycache__",
+    ".cache", ".venv", "venv", ".tox", ".mypy_cache", ".pytest_cache",
+}
+
+
+class GitUnavailable(RuntimeError):
+    """git is missing, or root is not inside a work tree"""
+
+
+def _is_pruned(relative_path):
+    return any(part in PRUNED_DIRS for part in Path(relative_path).parts[:-1])
+
+
+def walk_notebooks(root_path="."):
+    """Find all notebook files below root_path, skipping PRUNED_DIRS."""
+    root = Path(root_path)
+    notebooks = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in PRUNED_DIRS)
+        for filename in sorted(filenames):
+            if filename.endswith(".ipynb"):
+                notebooks.append(Path(dirpath) / filename)
+    return notebooks
+
+
+def _git_paths(root, *args):
+    """Run one git listing command under root and return its -z separated paths."""
+    try:
+        result = subprocess.run(["git", *args], cwd=root, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise GitUnavailable("git not found")
+    except subprocess.CalledProcessError as e:
+        raise GitUnavailable(e.stderr.decode(errors="replace").strip() or f"git {args[0]} failed")
+    return [p for p in result.stdout.decode(errors="surrogateescape").split("\0") if p]
+
+
+def find_changed_notebooks(root_path=".", ref="HEAD", staged=False):
+    """List notebooks under root_path that differ from ref (or are staged).
+
+    With staged=True only the index is compared against HEAD. Otherwise
+    the working tree is compared against ref, and untracked notebooks
+    are included. Deleted notebooks are left out. Raises GitUnavailable
+    outside a git work tree.
+    """
+    root = Path(root_path)
+    if staged:
+        paths = _git_paths(root, "diff", "--cached", "--name-only", "--relative",
+                           "--diff-filter=d", "-z", "--", "*.ipynb")
+    else:
+        paths = _git_paths(root, "diff", "--name-only", "--relative",
+                           "--diff-filter=d", "-z", ref, "--", "*.ipynb")
+        paths += _git_paths(root, "ls-files", "--others", "--exclude-standard",
+                            "-z", "--", "*.ipynb")
+
+    notebooks = []
+    for path in sorted(set(paths)):
+        if _is_pruned(path) or not (root / path).is_file():
+            continue
+        notebooks.append(root / path)
+    return notebooks
@@ -0,0 +1,595 @@
+"""
+Parallel notebook execution for notebook-prepare.py.
+
+execute_notebooks() runs jupyter-nbconvert for many notebooks at once on
+a bounded pool (one worker per CPU core by default):
+
+- Longest first: notebooks are started in descending order of their
+  recorded runtime (unknown ones first), so one slow notebook does not
+  start last and stretch the whole batch.
+- Two timeouts: the per-cell timeout (60 s by default) keeps its old
+  meaning and is passed to nbconvert/nbclient. Each notebook as a whole
+  also gets a deadline of TIMEOUT_FACTOR x its historical runtime, but
+  never less than NOTEBOOK_TIMEOUT_FLOOR or the per-cell timeout. A
+  timed-out run counts as at least as long as it ran, so the estimate
+  (and the next deadline) grows instead of failing the same way again.
+- Hung kernels: nbconvert runs in its own process group. At the
+  notebook deadline the whole group (nbconvert and its kernel) is killed
+  and the worker moves on to the next notebook.
+
+Two backends share that scheduler. run_nbconvert() starts one
+jupyter-nbconvert process per notebook. KernelPool.run() executes
+notebooks in this process with nbclient on warm, reused kernels, which
+skips the interpreter, Jupyter import and kernel startup cost on every
+notebook after the first (requires nbclient and ipykernel).
+
+After a successful run, both backends stamp the notebook with an
+execution fingerprint: a hash of its ordered code-cell sources and its
+kernelspec, stored in the notebook metadata:
+
+    "metadata": {"notebook_prepare": {"fingerprint": "sha256:..."}}
+
+is_up_to_date() compares it (FreshnessCheck does the same as a
+notebook_pipeline pass), so notebooks whose code is unchanged since
+their outputs were produced (markdown-only edits) are not re-executed.
+The stamp also keeps one hash per code cell; KernelPool.run_incremental()
+uses them with notebook_dependencies to re-execute only the changed
+cells and the cells depending on them.
+
+Runtimes are kept in .cache/notebook-execution/runtimes.json:
+
+    {"version": 1,
+     "notebooks": {"/abs/path.ipynb": {"seconds": 12.4, "runs": 3,
+                                       "status": "ok"}}}
+"""
+
+import copy
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from notebook_dependencies import plan_reexecution
+from notebook_pipeline import NotebookModel, NotebookPass, NotebookPipeline
+
+HISTORY_VERSION = 1
+DEFAULT_HISTORY_PATH = Path(".cache") / "notebook-execution" / "runtimes.json"
+# Per-cell timeout
+DEFAULT_TIMEOUT = 60
+# Whole-notebook deadline: TIMEOUT_FACTOR x the usual runtime, at least the floor
+TIMEOUT_FACTOR = 3
+NOTEBOOK_TIMEOUT_FLOOR = 600
+# Weight of the newest run in the runtime estimate
+RUNTIME_SMOOTHING = 0.5
+# Notebooks a pooled kernel runs before it is replaced by a fresh one
+DEFAULT_MAX_USES = 20
+DEFAULT_KERNEL = "python3"
+
+# Sent silently to a pooled kernel before each notebook. A new history
+# session restarts the execution counter at 1 (as a fresh kernel would)
+# without colliding with the previous notebook's history rows.
+KERNEL_RESET_CODE = """\
+import os as _os
+_os.chdir({cwd!r})
+get_ipython().reset(new_session=True)
+"""
+
+FINGERPRINT_NAMESPACE = "notebook_prepare"
+
+
+def _source(cell):
+    source = cell.get("source", "")
+    return "".join(source) if isinstance(source, list) else source
+
+
+def _code_cells(nb):
+    return [cell for cell in nb.get("cells", []) if cell.get("cell_type") == "code"]
+
+
+class CodeFingerprint:
+    """Incremental code_fingerprint(): add() the code cells in order"""
+
+    def __init__(self, kernelspec):
+        self.digest = hashlib.sha256()
+        self.digest.update(json.dumps(kernelspec, sort_keys=True).encode())
+
+    def add(self, cell):
+        encoded = _source(cell).encode()
+        # Length prefix keeps cell boundaries significant
+        self.digest.update(len(encoded).to_bytes(8, "big"))
+        self.digest.update(encoded)
+
+    def value(self):
+        return f"sha256:{self.digest.hexdigest()}"
+
+
+def code_fingerprint(nb):
+    """Hash of the kernelspec and the ordered code-cell sources"""
+    fingerprint = CodeFingerprint(nb.get("metadata", {}).get("kernelspec", {}))
+    for cell in _code_cells(nb):
+        fingerprint.add(cell)
+    return fingerprint.value()
+
+
+def cell_hashes(nb):
+    """Short source hash per code cell, in order"""
+    return [hashlib.sha256(_source(cell).encode()).hexdigest()[:16] for cell in _code_cells(nb)]
+
+
+def stamp_fingerprint(nb):
+    """Record the code fingerprints in the notebook metadata (in memory)"""
+    stamp = nb.setdefault("metadata", {}).setdefault(FINGERPRINT_NAMESPACE, {})
+    stamp["fingerprint"] = code_fingerprint(nb)
+    stamp["cells"] = cell_hashes(nb)
+
+
+class FreshnessCheck(NotebookPass):
+    """Pipeline pass computing is_up_to_date() during the shared traversal"""
+
+    name = "up_to_date"
+    cell_fields = ("source",)
+    metadata_fields = ("kernelspec", FINGERPRINT_NAMESPACE)
+
+    def begin(self, model):
+        metadata = model.nb.get("metadata", {})
+        return {"fingerprint": CodeFingerprint(metadata.get("kernelspec", {})), "clean": True}
+
+    def visit_cell(self, state, index, cell):
+        if cell.get("cell_type") != "code":
+            return
+        state["fingerprint"].add(cell)
+        # Empty cells are never executed, so a missing count there is expected
+        unexecuted = cell.get("execution_count") is None and _source(cell).strip()
+        if unexecuted or _has_error(cell):
+            state["clean"] = False
+
+    def finish(self, state, model):
+        stored = model.nb.get("metadata", {}).get(FINGERPRINT_NAMESPACE, {}).get("fingerprint")
+        return state["clean"] and stored == state["fingerprint"].value()
+
+
+def is_up_to_date(nb):
+    """True if the stored fingerprint matches and every non-empty code cell ran without error"""
+    return NotebookPipeline([FreshnessCheck()]).process(NotebookModel(None, nb))["up_to_date"]
+
+
+def _has_error(cell):
+    return any(output.get("output_type") == "error" for output in cell.get("outputs", []))
+
+
+def incremental_plan(nb):
+    """(dirty, replay) code-cell indices for an incremental run.
+
+    Returns None when only a full run is safe: no per-cell stamp, code
+    cells added or removed, a kernelspec change, or nothing left to skip.
+    """
+    stamp = nb.get("metadata", {}).get(FINGERPRINT_NAMESPACE, {})
+    stored = stamp.get("cells")
+    current = cell_hashes(nb)
+    if stored is None or len(stored) != len(current):
+        return None
+    if stored == current and stamp.get("fingerprint") != code_fingerprint(nb):
+        return None
+
+    code_cells = _code_cells(nb)
+    # Empty cells are never executed, so a missing count there is expected
+    changed = {i for i, cell in enumerate(code_cells)
+               if current[i] != stored[i] or _has_error(cell)
+               or (cell.get("execution_count") is None and _source(cell).strip())}
+    dirty, replay = plan_reexecution([_source(cell) for cell in code_cells], changed)
+    if len(dirty | replay) == len(code_cells):
+        return None
+    return dirty, replay
+
+
+def stamp_notebook_file(notebook_path):
+    """Stamp a notebook on disk, written the way nbformat writes it"""
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = json.load(f)
+    stamp_fingerprint(nb)
+    with open(notebook_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(nb, sort_keys=True, indent=1, ensure_ascii=False) + "\n")
+
+
+class RuntimeHistory:
+    """Smoothed per-notebook execution times"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.notebooks = {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == HISTORY_VERSION:
+                self.notebooks = data.get("notebooks", {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _key(notebook_path):
+        return str(Path(notebook_path).resolve())
+
+    def estimate(self, notebook_path):
+        """Expected runtime in seconds, or None if never run"""
+        entry = self.notebooks.get(self._key(notebook_path))
+        return entry["seconds"] if entry and "seconds" in entry else None
+
+    def notebook_timeout(self, notebook_path, cell_timeout=DEFAULT_TIMEOUT):
+        """Deadline in seconds for executing the whole notebook"""
+        minimum = max(NOTEBOOK_TIMEOUT_FLOOR, cell_timeout)
+        estimate = self.estimate(notebook_path)
+        if estimate is None:
+            return minimum
+        return max(minimum, int(estimate * TIMEOUT_FACTOR) + 1)
+
+    def record(self, notebook_path, status, seconds):
+        """Update the estimate.
+
+        A timed-out run took at least `seconds`, so the estimate becomes at
+        least that and the next deadline grows.
+        """
+        entry = self.notebooks.setdefault(self._key(notebook_path), {"runs": 0})
+        entry["status"] = status
+        previous = entry.get("seconds")
+        if status == "timeout":
+            entry["seconds"] = max(seconds, previous or 0)
+        else:
+            entry["seconds"] = (seconds if previous is None
+                                else RUNTIME_SMOOTHING * seconds + (1 - RUNTIME_SMOOTHING) * previous)
+        entry["runs"] += 1
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"version": HISTORY_VERSION, "notebooks": self.notebooks}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def schedule_order(notebooks, history):
+    """Longest expected runtime first; notebooks without history lead"""
+    def key(notebook_path):
+        estimate = history.estimate(notebook_path)
+        return (estimate is not None, -(estimate or 0))
+    return sorted(notebooks, key=key)
+
+
+def run_nbconvert(notebook_path, timeout=DEFAULT_TIMEOUT, notebook_timeout=None):
+    """Execute one notebook in place. Returns (status, seconds, detail).
+
+    timeout applies per cell; notebook_timeout (None: no limit) to the
+    whole run. status is "ok", "error", "timeout" or "missing"
+    (nbconvert not installed).
+    """
+    cmd = [
+        "jupyter-nbconvert",
+        "--to", "notebook",
+        "--execute",
+        "--inplace",
+        f"--ExecutePreprocessor.timeout={timeout}",
+        str(notebook_path)
+    ]
+    start = time.perf_counter()
+    try:
+        # Own process group, so a timeout also takes down the kernel
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, start_new_session=True)
+    except FileNotFoundError:
+        return "missing", 0.0, "jupyter-nbconvert not found"
+
+    try:
+        _, stderr = process.communicate(timeout=notebook_timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.communicate()
+        return "timeout", time.perf_counter() - start, f"killed after {notebook_timeout}s"
+
+    if process.returncode != 0:
+        return "error", time.perf_counter() - start, stderr
+    stamp_notebook_file(notebook_path)
+    return "ok", time.perf_counter() - start, stderr
+
+
+class _PooledKernel:
+    def __init__(self, kernel_name, startup_timeout=DEFAULT_TIMEOUT):
+        from jupyter_client import KernelManager
+        from jupyter_client.session import Session
+
+        self.kernel_name = kernel_name
+        self.km = KernelManager(kernel_name=kernel_name)
+        self.km.start_kernel()
+        # The reset client needs its own session: clients sharing the
+        # manager's session get the same shell socket identity, and the
+        # kernel would route replies to whichever connected last
+        # (nbclient's per-notebook client)
+        self.kc = self.km.client(session=Session(key=self.km.session.key,
+                                                 signature_scheme=self.km.session.signature_scheme))
+        self.kc.start_channels()
+        try:
+            self.kc.wait_for_ready(timeout=startup_timeout)
+        except RuntimeError:
+            self.shutdown()
+            raise
+        self.uses = 0
+
+    def set_execution_count(self, count, timeout):
+        self.kc.execute_interactive(f"get_ipython().execution_count = {int(count)}", silent=True,
+                                    store_history=False, timeout=timeout, output_hook=lambda msg: None)
+
+    def reset(self, cwd, timeout):
+        """Clear the namespace, chdir and restart the execution counter"""
+        reply = self.kc.execute_interactive(KERNEL_RESET_CODE.format(cwd=cwd), silent=True,
+                                            store_history=False, timeout=timeout,
+                                            output_hook=lambda msg: None)
+        return reply["content"]
+
+    def shutdown(self):
+        try:
+            self.kc.stop_channels()
+            self.km.shutdown_kernel(now=True)
+        except Exception:
+            pass
+
+
+class KernelPool:
+    """Warm Jupyter kernels reused across notebooks, with the same in-place
+    write semantics as `jupyter-nbconvert --execute --inplace`.
+
+    Between notebooks a kernel is reset rather than restarted: its
+    namespace is cleared, the working directory moves to the notebook's
+    folder and the execution counter goes back to 1. Modules it has
+    imported stay loaded, so each kernel is replaced after `max_uses`
+    notebooks, and immediately after a timeout or crash. Replacements
+    start in the background so the pool stays warm.
+    """
+
+    def __init__(self, size, kernel_name=DEFAULT_KERNEL, max_uses=DEFAULT_MAX_USES):
+        # Fail early (ImportError) when the in-process stack is missing
+        import jupyter_client  # noqa: F401
+        import nbclient  # noqa: F401
+        import nbformat  # noqa: F401
+
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = {}
+        self._starting = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        for _ in range(size):
+            self._start_in_background(kernel_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _start_in_background(self, kernel_name):
+        with self._condition:
+            self._starting[kernel_name] = self._starting.get(kernel_name, 0) + 1
+
+        def start():
+            try:
+                kernel = _PooledKernel(kernel_name)
+            except Exception:
+                kernel = None
+            with self._condition:
+                self._starting[kernel_name] -= 1
+                if kernel and not self._closed:
+                    self._idle.setdefault(kernel_name, []).append(kernel)
+                    kernel = None
+                self._condition.notify_all()
+            if kernel:
+                kernel.shutdown()
+
+        threading.Thread(target=start, daemon=True).start()
+
+    def acquire(self, kernel_name):
+        """Take an idle kernel, wait for one that is starting, or start one"""
+        with self._condition:
+            while True:
+                idle = self._idle.get(kernel_name)
+                if idle:
+                    return idle.pop()
+                if not self._starting.get(kernel_name):
+                    break
+                self._condition.wait()
+        return _PooledKernel(kernel_name)
+
+    def release(self, kernel, reusable=True):
+        kernel.uses += 1
+        with self._condition:
+            idle = self._idle.setdefault(kernel.kernel_name, [])
+            if reusable and kernel.uses < self.max_uses and len(idle) < self.size and not self._closed:
+                idle.append(kernel)
+                self._condition.notify_all()
+                return
+            replace = not self._closed and len(idle) < self.size
+        kernel.shutdown()
+        if replace:
+            self._start_in_background(kernel.kernel_name)
+
+    def shutdown(self):
+        with self._condition:
+            self._closed = True
+            kernels = [k for idle in self._idle.values() for k in idle]
+            self._idle.clear()
+        for kernel in kernels:
+            kernel.shutdown()
+
+    def run(self, notebook_path, timeout=DEFAULT_TIMEOUT, notebook_timeout=None):
+        """Execute one notebook in place on a pooled kernel.
+
+        Same contract as run_nbconvert(): returns (status, seconds, detail),
+        timeout applies per cell, notebook_timeout to the whole run, and the
+        file is only rewritten on success.
+        """
+        return self._run(notebook_path, timeout, notebook_timeout, incremental=False)
+
+    def run_incremental(self, notebook_path, timeout=DEFAULT_TIMEOUT, notebook_timeout=None):
+        """Like run(), but only re-execute changed cells and their dependents.
+
+        Clean cells keep their stored outputs. Clean cells whose state the
+        re-executed cells need are replayed silently first. Falls back to
+        a full run when incremental_plan() says so.
+        """
+        return self._run(notebook_path, timeout, notebook_timeout, incremental=True)
+
+    def _run(self, notebook_path, timeout, notebook_timeout, incremental):
+        import nbformat
+        from nbclient import NotebookClient
+        from nbclient.exceptions import CellExecutionError, CellTimeoutError, DeadKernelError
+
+        start = time.perf_counter()
+        try:
+            nb = nbformat.read(str(notebook_path), as_version=4)
+            kernel_name = nb.metadata.get("kernelspec", {}).get("name") or DEFAULT_KERNEL
+            notebook_dir = str(Path(notebook_path).resolve().parent)
+        except Exception as e:
+            return "error", time.perf_counter() - start, f"could not read notebook: {e}"
+
+        try:
+            kernel = self.acquire(kernel_name)
+        except Exception as e:
+            return "error", time.perf_counter() - start, f"could not start kernel {kernel_name}: {e}"
+
+        # At the notebook deadline the running cell is interrupted; the
+        # kernel is then replaced like after any other timeout
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            try:
+                kernel.km.interrupt_kernel()
+            except Exception:
+                pass
+
+        deadline = threading.Timer(notebook_timeout, expire) if notebook_timeout else None
+        if deadline:
+            deadline.daemon = True
+            deadline.start()
+
+        reusable = False
+        client = None
+        try:
+            reset = kernel.reset(notebook_dir, timeout)
+            if reset["status"] != "ok":
+                return "error", time.perf_counter() - start, f"kernel reset failed: {reset}"
+
+            client = NotebookClient(nb, km=kernel.km, timeout=timeout, kernel_name=kernel_name,
+                                    resources={"metadata": {"path": notebook_dir}})
+            plan = incremental_plan(nb) if incremental else None
+            if plan is None:
+                client.execute()
+                detail = ""
+            else:
+                dirty, replay = plan
+                self._execute_cells(kernel, client, dirty, replay, timeout)
+                detail = f"incremental: {len(dirty)} re-executed, {len(replay)} replayed"
+            stamp_fingerprint(nb)
+            nbformat.write(nb, str(notebook_path))
+            reusable = True
+            return "ok", time.perf_counter() - start, detail
+        except CellTimeoutError as e:
+            return "timeout", time.perf_counter() - start, str(e)
+        except CellExecutionError as e:
+            if expired.is_set():
+                return "timeout", time.perf_counter() - start, f"interrupted after {notebook_timeout}s"
+            reusable = True
+            return "error", time.perf_counter() - start, str(e)
+        except (DeadKernelError, TimeoutError, RuntimeError) as e:
+            return "error", time.perf_counter() - start, str(e)
+        except Exception as e:
+            # Anything else (e.g. OSError writing the file) fails this
+            # notebook only; the kernel is replaced to be safe
+            return "error", time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        finally:
+            if deadline:
+                deadline.cancel()
+            if expired.is_set():
+                reusable = False
+            if client is not None and client.kc is not None:
+                client.kc.stop_channels()
+                client.kc = None
+            self.release(kernel, reusable)
+
+    @staticmethod
+    def _execute_cells(kernel, client, dirty, replay, timeout):
+        """Run the dirty cells (and silent replays) numbered as a full run would"""
+        with client.setup_kernel():
+            info = client.wait_for_reply(client.kc.kernel_info())
+            if info is not None and "language_info" in info["content"]:
+                client.nb.metadata["language_info"] = info["content"]["language_info"]
+
+            code_index = -1
+            execution_count = 0
+            for index, cell in enumerate(client.nb.cells):
+                if cell.cell_type != "code":
+                    continue
+                code_index += 1
+                # nbclient skips empty cells without consuming a count
+                if not cell.source.strip():
+                    continue
+                execution_count += 1
+
+                if code_index in dirty:
+                    target = cell
+                elif code_index in replay:
+                    target = copy.deepcopy(cell)
+                else:
+                    cell.execution_count = execution_count
+                    for output in cell.outputs:
+                        if output.output_type == "execute_result":
+                            output.execution_count = execution_count
+                    continue
+                kernel.set_execution_count(execution_count, timeout)
+                client.execute_cell(target, index, execution_count=execution_count)
+            client.set_widgets_metadata()
+
+
+def execute_notebooks(notebooks, jobs=None, history=None, cell_timeout=DEFAULT_TIMEOUT,
+                      runner=run_nbconvert, on_result=None):
+    """Execute notebooks concurrently, longest first.
+
+    runner(notebook_path, cell_timeout, notebook_timeout) gets the
+    per-cell timeout and the notebook's deadline from history.
+
+    on_result(notebook_path, status, seconds, detail) is called from the
+    calling thread as each notebook finishes. Returns {path: status}.
+    """
+    history = history or RuntimeHistory()
+    jobs = jobs or os.cpu_count() or 1
+    ordered = schedule_order(notebooks, history)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(runner, nb, cell_timeout, history.notebook_timeout(nb, cell_timeout)): nb
+                   for nb in ordered}
+        for future in as_completed(futures):
+            notebook_path = futures[future]
+            try:
+                status, seconds, detail = future.result()
+            except Exception as e:
+                # A runner bug must not abort the batch; the bogus time isn't recorded
+                status, seconds, detail = "error", None, f"{type(e).__name__}: {e}"
+            if status != "missing" and seconds is not None:
+                history.record(notebook_path, status, seconds)
+            results[notebook_path] = status
+            if on_result:
+                on_result(notebook_path, status, seconds, detail)
+
+    history.save()
+    return results
@@ -0,0 +1,167 @@
+"""
+Single-pass notebook processing shared by the notebook scripts.
+
+validate-notebooks.py, notebook-prepare.py and the fix-notebook scripts
+used to load the same notebook separately and each walk its cells.
+NotebookPipeline loads a notebook once into a NotebookModel and runs any
+number of passes over it in one traversal of the cells:
+
+    pipeline = NotebookPipeline([FormatCheck(), ExecutionAudit(), ErrorScan()])
+    results, timings = pipeline.run("analysis.ipynb")
+    results["execution"]["unexecuted"]
+
+A pass declares the cell and metadata fields it reads, so large notebooks
+are still streamed (notebook_stream.read_notebook) with just the union
+of those fields decoded. Each pass gets begin() once per notebook,
+visit_cell() for every cell in order and returns its result from
+finish(). Per-notebook state lives in the value begin() returns, so pass
+objects can be shared between notebooks and threads.
+
+Passes report facts, not messages; each script words its own issues.
+Domain passes live next to their logic: notebook_execution.FreshnessCheck
+(execution fingerprint) and notebook_restructure.ClassifyCells (rule-file
+cell classification).
+"""
+
+import time
+
+from notebook_stream import read_notebook
+
+
+class NotebookModel:
+    """One loaded notebook shared by every pass.
+
+    nb may be a streamed skeleton holding only the fields the passes
+    declared. spans, when loaded with spans=True, maps each cell to its
+    byte range in the file; close() releases it.
+    """
+
+    def __init__(self, path, nb, spans=None):
+        self.path = path
+        self.nb = nb
+        self.spans = spans
+
+    @property
+    def cells(self):
+        cells = self.nb.get('cells', [])
+        return cells if isinstance(cells, list) else []
+
+    def close(self):
+        if self.spans:
+            self.spans.close()
+            self.spans = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NotebookPass:
+    """Base class for pipeline passes"""
+
+    name = None
+    cell_fields = ()
+    metadata_fields = ()
+
+    def begin(self, model):
+        """Return the per-notebook state handed to visit_cell() and finish()"""
+        return None
+
+    def visit_cell(self, state, index, cell):
+        pass
+
+    def finish(self, state, model):
+        return state
+
+
+class FormatCheck(NotebookPass):
+    """Top-level structure: nbformat, metadata keys, presence of cells"""
+
+    name = "format"
+
+    def finish(self, state, model):
+        nb = model.nb
+        return {
+            "nbformat": nb.get('nbformat'),
+            "has_nbformat": 'nbformat' in nb,
+            "metadata_keys": set(nb['metadata']) if 'metadata' in nb else None,
+            "has_cells": 'cells' in nb,
+        }
+
+
+class ExecutionAudit(NotebookPass):
+    """Code cells never executed or without outputs"""
+
+    name = "execution"
+
+    def begin(self, model):
+        return {"code_cells": 0, "unexecuted": 0, "no_output": 0}
+
+    def visit_cell(self, state, index, cell):
+        if cell.get('cell_type') != 'code':
+            return
+        state["code_cells"] += 1
+        if cell.get('execution_count') is None:
+            state["unexecuted"] += 1
+        if not cell.get('outputs'):
+            state["no_output"] += 1
+
+
+class ErrorScan(NotebookPass):
+    """Indices (among code cells) of cells with error outputs"""
+
+    name = "errors"
+
+    def begin(self, model):
+        return {"code_index": 0, "cells": []}
+
+    def visit_cell(self, state, index, cell):
+        if cell.get('cell_type') != 'code':
+            return
+        if any(output.get('output_type') == 'error' for output in cell.get('outputs', [])):
+            state["cells"].append(state["code_index"])
+        state["code_index"] += 1
+
+    def finish(self, state, model):
+        return state["cells"]
+
+
+class NotebookPipeline:
+    """Load a notebook once and run all passes in a single cell traversal"""
+
+    def __init__(self, passes):
+        self.passes = list(passes)
+        names = [p.name for p in self.passes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate pass names: {names}")
+        self.cell_fields = tuple(sorted({f for p in self.passes for f in p.cell_fields}))
+        self.metadata_fields = tuple(sorted({f for p in self.passes for f in p.metadata_fields}))
+
+    def load(self, notebook_path, spans=False, stream=True):
+        """Read a notebook with every field the passes need.
+
+        stream=False always loads the complete notebook. Raises
+        json.JSONDecodeError for invalid files.
+        """
+        options = {} if stream else {"threshold": float("inf")}
+        nb, cell_spans = read_notebook(notebook_path, self.cell_fields, self.metadata_fields,
+                                       spans=spans, **options)
+        return NotebookModel(notebook_path, nb, cell_spans)
+
+    def process(self, model):
+        """Run every pass over an already loaded model; returns {pass name: result}"""
+        active = [(p, p.begin(model)) for p in self.passes]
+        for index, cell in enumerate(model.cells):
+            for p, state in active:
+                p.visit_cell(state, index, cell)
+        return {p.name: p.finish(state, model) for p, state in active}
+
+    def run(self, notebook_path):
+        """Load and process a notebook; returns (results, {"load": s, "passes": s})"""
+        start = time.perf_counter()
+        with self.load(notebook_path) as model:
+            loaded = time.perf_counter()
+            results = self.process(model)
+        return results, {"load": loaded - start, "passes": time.perf_counter() - loaded}
@@ -0,0 +1,337 @@
+"""
+Declarative notebook restructuring for the fix-notebook scripts.
+
+A rule file (JSON) describes how to recognise the cells of a notebook and
+in which order to lay them out again:
+
+    {"notebook": "path/to/analysis.ipynb",
+     "collect": ["section1"],
+     "rules": [
+         {"slot": "title", "contains": ["# Scenario 1 Deep Dive"]},
+         {"slot": "q1.1_code", "contains": ["Question 1.1"],
+          "requires": ["calculate these percentages"], "cell_type": "code"},
+         {"slot": "section1", "contains": ["Question 1.2", "Phase 1:"]},
+         {"slot": "q3.1", "contains": ["Question 3.1"],
+          "requires": [{"text": "challenge", "ignore_case": true}]}],
+     "layout": [
+         {"slot": "title", "required": true},
+         "q1.1_code",
+         {"cell": {"cell_type": "markdown", "metadata": {}, "source": ["..."]}},
+         {"when": "section1", "then": ["section1"]}]}
+
+Rules are tried in order and the first match wins, like an elif chain. A
+rule matches a cell when its source contains any of the "contains"
+patterns and all of the "requires" patterns, and the cell type (if given)
+agrees. A slot keeps the last matching cell, or every matching cell in
+notebook order when it is listed under "collect".
+
+Layout entries are a slot name, a slot that must be present, a literal
+cell to insert, or a group that is only laid out when a slot is filled.
+Cells that no rule claims, or whose slot is not in the layout, are dropped.
+
+All patterns of a rule set are compiled once into one alternation regex
+(plus one over the lowercased source for ignore_case patterns). A cell
+costs one regex search when nothing matches; otherwise the patterns
+found pick the candidate rules, which are checked in order. Rule sets
+loaded from a file are cached by path and mtime. The reorder is a list
+of indices into the original cells; cells are moved, never copied.
+
+restructure_file() runs the classification as a notebook_pipeline pass
+and rewrites the notebook without re-serializing it: the pipeline loads
+the byte range of every cell along with its cell_type and source, and
+the new file is assembled by copying those ranges from the memory-mapped
+original in the new order. Only inserted cells are serialized, indented
+to match their neighbours. Output blobs, key order and formatting stay
+byte-for-byte as they were, so the git diff shows just the moved cells.
+The file is replaced atomically (temp file plus rename). Files the
+scanner can't map fall back to json.load/json.dump.
+"""
+
+import copy
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from notebook_pipeline import NotebookPass, NotebookPipeline
+
+
+class RestructureError(ValueError):
+    """Invalid rule file, or a required slot no cell matched"""
+
+
+def _pattern_key(pattern):
+    if isinstance(pattern, str):
+        text, ignore_case = pattern, False
+    else:
+        text, ignore_case = pattern.get("text", ""), bool(pattern.get("ignore_case"))
+    if not text:
+        raise RestructureError(f"Empty pattern: {pattern!r}")
+    return (text.lower(), True) if ignore_case else (text, False)
+
+
+class _Rule:
+    def __init__(self, spec):
+        if "slot" not in spec or not spec.get("contains"):
+            raise RestructureError(f"Rule needs a slot and at least one pattern: {spec!r}")
+        self.slot = spec["slot"]
+        self.cell_type = spec.get("cell_type")
+        self.contains = [_pattern_key(p) for p in spec["contains"]]
+        self.requires = [_pattern_key(p) for p in spec.get("requires", [])]
+
+
+def _pattern_scanner(patterns):
+    """found(source) -> set of the pattern keys whose text occurs in source.
+
+    One findall() over an alternation regex, longest text first: each match
+    is the longest text starting at its position, and the texts contained
+    in it are implied. A text that starts inside a match and runs past its
+    end is not seen by findall(), so those are tested directly, and only
+    after a match they could overlap.
+    """
+    texts = sorted({text for text, _ in patterns}, key=len, reverse=True)
+    implied = {text: {p for p in patterns if p[0] in text} for text in texts}
+    overlapping = {text: [other for other in texts if other not in text
+                          and any(text.endswith(other[:k]) for k in range(1, len(other)))]
+                   for text in texts}
+    findall = re.compile("|".join(map(re.escape, texts))).findall
+
+    def found(source):
+        hits = set()
+        for text in findall(source):
+            hits |= implied[text]
+            for other in overlapping[text]:
+                if other in source:
+                    hits |= implied[other]
+        return hits
+
+    return found
+
+
+class _Matcher:
+    """classify(cell): slot of the first rule matching the cell, or None"""
+
+    def __init__(self, rules):
+        self.rules = [([p for p in rule.requires if not p[1]], [p for p in rule.requires if p[1]],
+                       rule.cell_type, rule.slot) for rule in rules]
+        # pattern key -> indices of the rules listing it under "contains", ascending
+        self.rules_by_pattern = {}
+        for index, rule in enumerate(rules):
+            for pattern in dict.fromkeys(rule.contains):
+                self.rules_by_pattern.setdefault(pattern, []).append(index)
+        patterns = {p for rule in rules for p in rule.contains + rule.requires}
+        exact = {p for p in patterns if not p[1]}
+        folded = patterns - exact
+        self.find = _pattern_scanner(exact) if exact else lambda source: set()
+        self.find_folded = _pattern_scanner(folded) if folded else None
+        # Lowercase every cell only if ignore-case patterns can select a
+        # rule; otherwise just when a candidate rule requires one
+        self.always_fold = any(p in folded for p in self.rules_by_pattern)
+
+    def __call__(self, cell):
+        source = cell.get('source', [])
+        if not isinstance(source, str):
+            source = ''.join(source)
+        hits = self.find(source)
+        folded_hits = self.find_folded(source.lower()) if self.always_fold else None
+        if folded_hits:
+            hits |= folded_hits
+        best = None
+        for pattern in hits:
+            for index in self.rules_by_pattern.get(pattern, ()):
+                if best is not None and index >= best:
+                    break
+                requires, requires_folded, cell_type, _ = self.rules[index]
+                if requires_folded and folded_hits is None:
+                    folded_hits = self.find_folded(source.lower())
+                if (all(p in hits for p in requires) and all(p in folded_hits for p in requires_folded)
+                        and (not cell_type or cell.get('cell_type') == cell_type)):
+                    best = index
+                    break
+        return None if best is None else self.rules[best][3]
+
+
+# (path, mtime_ns, size) -> RuleSet, filled by RuleSet.load()
+_loaded = {}
+
+
+class RuleSet:
+    """Compiled rule file: classify() cells into slots, then layout() them"""
+
+    def __init__(self, spec):
+        self.notebook = spec.get("notebook")
+        self.collect = set(spec.get("collect", []))
+        self.layout_spec = spec.get("layout", [])
+
+        self.rules = [_Rule(rule) for rule in spec.get("rules", [])]
+        if not self.rules:
+            raise RestructureError("Rule file has no rules")
+        # classify_cell(cell): slot of the first rule matching the cell, or None
+        self.classify_cell = _Matcher(self.rules)
+
+    @classmethod
+    def load(cls, rules_path):
+        """Load and compile a rule file, reusing the compiled set while the file is unchanged"""
+        st = os.stat(rules_path)
+        key = (os.path.abspath(rules_path), st.st_mtime_ns, st.st_size)
+        rules = _loaded.get(key)
+        if rules is None:
+            with open(rules_path, 'r') as f:
+                rules = _loaded[key] = cls(json.load(f))
+        return rules
+
+    def assign(self, slots, slot, index):
+        if slot in self.collect:
+            slots[slot].append(index)
+        else:
+            slots[slot] = index
+
+    def classify(self, cells):
+        """Map slot -> cell index (or list of indices for collected slots)"""
+        slots = {slot: [] for slot in self.collect}
+        for index, cell in enumerate(cells):
+            slot = self.classify_cell(cell)
+            if slot is not None:
+                self.assign(slots, slot, index)
+        return slots
+
+    def _filled(self, slots, slot):
+        value = slots.get(slot)
+        return bool(value) if slot in self.collect else value is not None
+
+    def _lay_out(self, entries, slots, order):
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"slot": entry}
+            if "cell" in entry:
+                order.append(entry["cell"])
+            elif "when" in entry:
+                if self._filled(slots, entry["when"]):
+                    self._lay_out(entry.get("then", []), slots, order)
+            elif "slot" in entry:
+                slot = entry["slot"]
+                if not self._filled(slots, slot):
+                    if entry.get("required"):
+                        raise RestructureError(f"No cell matched required slot '{slot}'")
+                    continue
+                value = slots[slot]
+                order.extend(value if slot in self.collect else [value])
+            else:
+                raise RestructureError(f"Unknown layout entry: {entry!r}")
+
+    def layout(self, slots):
+        """New cell order: indices into the original cells, or inserted cell dicts"""
+        order = []
+        self._lay_out(self.layout_spec, slots, order)
+        return order
+
+
+class ClassifyCells(NotebookPass):
+    """Pipeline pass: the slot map of RuleSet.classify()"""
+
+    name = "slots"
+    cell_fields = ('source',)
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def begin(self, model):
+        return {slot: [] for slot in self.rules.collect}
+
+    def visit_cell(self, state, index, cell):
+        slot = self.rules.classify_cell(cell)
+        if slot is not None:
+            self.rules.assign(state, slot, index)
+
+
+def _reorder(nb, order):
+    cells = nb['cells']
+    nb['cells'] = [cells[item] if isinstance(item, int) else copy.deepcopy(item) for item in order]
+
+
+def restructure(nb, rules):
+    """Reorder nb['cells'] in place per rules and return the slot map"""
+    slots = rules.classify(nb['cells'])
+    _reorder(nb, rules.layout(slots))
+    return slots
+
+
+def _write_temp(notebook_path, write):
+    """Call write(f) on a new temp file next to notebook_path; returns its path"""
+    directory = os.path.dirname(os.path.abspath(notebook_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(notebook_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        shutil.copymode(notebook_path, tmp_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _cell_indent(buf, spans):
+    """Indentation of the first cell's line and the JSON indent width it implies"""
+    first = spans.ranges[0][0]
+    line_start = buf.rfind(b'\n', spans.array_start, first)
+    indent = bytes(buf[line_start + 1:first]) if line_start != -1 else b''
+    if line_start == -1 or indent.strip(b' '):
+        return b'', None
+    # Cells sit two levels deep: {"cells": [ {...} ]}
+    return indent, max(len(indent) // 2, 1)
+
+
+def _write_spans(f, buf, spans, order):
+    """Write the notebook with its cells replaced by `order`, copying original bytes"""
+    cells = spans.ranges
+    indent, width = _cell_indent(buf, spans)
+    lead = bytes(buf[spans.array_start + 1:cells[0][0]])
+    trail = bytes(buf[cells[-1][1]:spans.array_end - 1])
+    separator = bytes(buf[cells[0][1]:cells[1][0]]) if len(cells) > 1 else b',' + lead
+
+    with memoryview(buf) as view:
+        f.write(view[:spans.array_start + 1])
+        if order:
+            f.write(lead)
+            for position, item in enumerate(order):
+                if position:
+                    f.write(separator)
+                if isinstance(item, int):
+                    start, end = cells[item]
+                    f.write(view[start:end])
+                else:
+                    text = json.dumps(item, indent=width, ensure_ascii=False).encode('utf-8')
+                    f.write(text.replace(b'\n', b'\n' + indent))
+            f.write(trail)
+        f.write(view[spans.array_end - 1:])
+
+
+def restructure_file(notebook_path, rules, preserve_bytes=True):
+    """Restructure a notebook file in place.
+
+    Returns (original cell count, new cell count, slots). With
+    preserve_bytes=False (or when the file can't be mapped) the notebook
+    is re-serialized with json.dump(indent=1) instead.
+    """
+    pipeline = NotebookPipeline([ClassifyCells(rules)])
+    with pipeline.load(notebook_path, spans=preserve_bytes, stream=preserve_bytes) as model:
+        original = len(model.cells)
+        slots = pipeline.process(model)["slots"]
+        order = rules.layout(slots)
+        spans = model.spans
+        if spans and spans.ranges:
+            tmp_path = _write_temp(notebook_path, lambda f: _write_spans(f, spans.buf, spans, order))
+        else:
+            _reorder(model.nb, order)
+            text = json.dumps(model.nb, indent=1).encode('utf-8')
+            tmp_path = _write_temp(notebook_path, lambda f: f.write(text))
+    # Replaced only after the original is unmapped
+    os.replace(tmp_path, notebook_path)
+    return original, len(order), slots
+
+
+def default_rules_path(name):
+    """Rule files shipped next to the scripts"""
+    return Path(__file__).with_name("restructure-rules") / f"{name}.json"
@@ -0,0 +1,408 @@
+"""
+Streaming notebook reader for the validation scripts.
+
+validate-notebooks.py and notebook-prepare.py only need the top-level
+nbformat, the metadata keys, and cell_type / execution_count /
+outputs[].output_type of each cell. Notebooks with embedded base64 image
+outputs can be hundreds of MB, and json.load turns all of that into
+Python objects first.
+
+load_notebook_skeleton() memory-maps large files and walks the JSON
+with an event-style scanner: it decodes only the fields above and skips
+everything else (outputs[].data, sources, attachments, ...) by matching
+it in place. The result is a skeleton notebook dict with the same shape
+as the real one for those fields, so existing checks run unchanged:
+
+    {"nbformat": 4,
+     "metadata": {"kernelspec": None, "language_info": None},
+     "cells": [{"cell_type": "code", "execution_count": 3,
+                "outputs": [{"output_type": "display_data"}]}]}
+
+The scanner checks the JSON grammar while skipping. If a file is not
+well-formed, it falls back to json.load, so error messages stay exactly
+the same. One deliberate gap: escape-free strings that are skipped are
+not checked for raw control characters, which no notebook writer emits;
+that check alone would cost more than the rest of the scan. Small files
+go straight to json.load, which is faster below
+STREAMING_THRESHOLD_BYTES, and so do large notebooks whose bytes are
+mostly many small tokens (see is_payload_heavy).
+
+read_notebook() is the general entry point used by notebook_pipeline:
+callers can ask for extra cell and metadata fields in the skeleton, and
+for the byte range of every cell in the file (so a reordered notebook
+can be written by copying the original bytes of each cell). Token-dense
+notebooks have their values decoded by json's C decoder instead, on a
+latin-1 view of the bytes where string offsets equal byte offsets.
+"""
+
+import json
+import mmap
+import os
+import re
+
+STREAMING_THRESHOLD_BYTES = 4 * 1024 * 1024
+# Streaming costs a few microseconds per JSON token, so it only wins when
+# most bytes sit in long strings. Sampled bytes per '"' below this ratio
+# (source- or text-heavy notebooks) go to json.load instead.
+MIN_BYTES_PER_QUOTE = 1024
+SAMPLE_WINDOWS = 16
+SAMPLE_WINDOW_BYTES = 64 * 1024
+
+_WS = re.compile(rb'[ \t\n\r]*')
+# Whitespace, then an optional comma and more whitespace: what separates array elements
+_TEXT_SEPARATOR = re.compile(r'[ \t\n\r]*(?:(,)[ \t\n\r]*)?')
+# Strict JSON string (no raw control characters, only valid escapes)
+_STRING = re.compile(rb'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"')
+_NUMBER = re.compile(rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?')
+# Literals json.load accepts, including its NaN/Infinity extensions
+_LITERAL = re.compile(rb'true|false|null|NaN|Infinity|-Infinity')
+# Cell fields every skeleton decodes (outputs are reduced to output_type)
+SKELETON_CELL_FIELDS = ('cell_type', 'execution_count')
+
+
+class _MalformedJSON(Exception):
+    """Raised by the scanner; callers fall back to json.load for the real error"""
+
+
+class _Scanner:
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+        self.end = len(buf)
+
+    def ws(self):
+        self.pos = _WS.match(self.buf, self.pos).end()
+
+    def peek(self):
+        return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.buf[self.pos:self.pos + 1] != char:
+            raise _MalformedJSON(self.pos)
+        self.pos += 1
+
+    def _skip_string(self):
+        # Fast path for escape-free strings such as base64 payloads: one
+        # memchr for the closing quote instead of a per-byte regex loop
+        close = self.buf.find(b'"', self.pos + 1)
+        if close != -1 and self.buf.find(b'\\', self.pos + 1, close) == -1:
+            self.pos = close + 1
+            return
+        match = _STRING.match(self.buf, self.pos)
+        if not match:
+            raise _MalformedJSON(self.pos)
+        self.pos = match.end()
+
+    def _skip_scalar(self):
+        if self.buf[self.pos:self.pos + 1] == b'"':
+            self._skip_string()
+            return
+        for pattern in (_NUMBER, _LITERAL):
+            match = pattern.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+        raise _MalformedJSON(self.pos)
+
+    def skip_value(self):
+        """Validate and skip one value without building Python objects"""
+        self.ws()
+        char = self.peek()
+        if char == b'{':
+            for _ in self.members():
+                self.skip_value()
+        elif char == b'[':
+            for _ in self.elements():
+                self.skip_value()
+        else:
+            self._skip_scalar()
+
+    def parse_value(self):
+        """Decode one (small) value"""
+        self.ws()
+        start = self.pos
+        self.skip_value()
+        return json.loads(self.buf[start:self.pos])
+
+    def members(self):
+        """Iterate an object, yielding each key; the caller consumes the value"""
+        self.ws()
+        self.expect(b'{')
+        self.ws()
+        if self.peek() == b'}':
+            self.pos += 1
+            return
+        while True:
+            self.ws()
+            match = _STRING.match(self.buf, self.pos)
+            if not match:
+                raise _MalformedJSON(self.pos)
+            key = json.loads(self.buf[match.start():match.end()])
+            self.pos = match.end()
+            self.ws()
+            self.expect(b':')
+            yield key
+            self.ws()
+            if self.peek() == b',':
+                self.pos += 1
+                continue
+            self.expect(b'}')
+            return
+
+    def elements(self):
+        """Iterate an array, yielding each index; the caller consumes the element"""
+        self.ws()
+        self.expect(b'[')
+        self.ws()
+        if self.peek() == b']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            self.ws()
+            if self.peek() == b',':
+                self.pos += 1
+                continue
+            self.expect(b']')
+            return
+
+
+def _scan_output(scanner):
+    scanner.ws()
+    if scanner.peek() != b'{':
+        return scanner.parse_value()
+    output = {}
+    for key in scanner.members():
+        if key == 'output_type':
+            output[key] = scanner.parse_value()
+        else:
+            scanner.skip_value()
+    return output
+
+
+def _scan_cell(scanner, cell_fields=()):
+    scanner.ws()
+    if scanner.peek() != b'{':
+        return scanner.parse_value()
+    cell = {}
+    for key in scanner.members():
+        if key in SKELETON_CELL_FIELDS or key in cell_fields:
+            cell[key] = scanner.parse_value()
+        elif key == 'outputs':
+            scanner.ws()
+            if scanner.peek() == b'[':
+                cell[key] = [_scan_output(scanner) for _ in scanner.elements()]
+            else:
+                cell[key] = scanner.parse_value()
+        else:
+            scanner.skip_value()
+    return cell
+
+
+class CellSpans:
+    """Byte layout of a notebook's cells array inside a memory-mapped file.
+
+    array_start/array_end bracket the '[' ... ']' of "cells"; ranges holds
+    one (start, end) per cell, in file order. close() unmaps the file.
+    """
+
+    def __init__(self, buf, array_start, array_end, ranges):
+        self.buf = buf
+        self.array_start = array_start
+        self.array_end = array_end
+        self.ranges = ranges
+
+    def close(self):
+        self.buf.close()
+
+
+def _scan(buf, cell_fields=(), metadata_fields=()):
+    """Skeleton notebook plus (array_start, array_end, ranges) of its cells"""
+    scanner = _Scanner(buf)
+    scanner.ws()
+    if scanner.peek() != b'{':
+        raise _MalformedJSON(scanner.pos)
+
+    nb = {}
+    layout = None
+    for key in scanner.members():
+        if key == 'nbformat':
+            nb[key] = scanner.parse_value()
+        elif key == 'metadata':
+            scanner.ws()
+            if scanner.peek() == b'{':
+                metadata = {}
+                for meta_key in scanner.members():
+                    if meta_key in metadata_fields:
+                        metadata[meta_key] = scanner.parse_value()
+                    else:
+                        metadata[meta_key] = None
+                        scanner.skip_value()
+                nb[key] = metadata
+            else:
+                nb[key] = scanner.parse_value()
+        elif key == 'cells':
+            scanner.ws()
+            if scanner.peek() == b'[':
+                array_start = scanner.pos
+                cells, ranges = [], []
+                for _ in scanner.elements():
+                    scanner.ws()
+                    start = scanner.pos
+                    cells.append(_scan_cell(scanner, cell_fields))
+                    ranges.append((start, scanner.pos))
+                nb[key] = cells
+                layout = (array_start, scanner.pos, ranges)
+            else:
+                nb[key] = scanner.parse_value()
+                layout = None
+        else:
+            scanner.skip_value()
+
+    scanner.ws()
+    if scanner.pos != scanner.end:
+        raise _MalformedJSON(scanner.pos)
+    return nb, layout
+
+
+def scan_notebook_buffer(buf):
+    """Build the skeleton notebook from a bytes-like buffer (raises _MalformedJSON)"""
+    return _scan(buf)[0]
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _decode(buf):
+    """Whole notebook plus cell layout, decoded value by value with json's C decoder.
+
+    The bytes are viewed as latin-1, so string offsets are byte offsets;
+    values containing raw UTF-8 are decoded again from their bytes.
+    """
+    raw = bytes(buf)
+    text, ascii_only = raw.decode('latin-1'), raw.isascii()
+    scanner = _Scanner(buf)
+
+    def value():
+        start = scanner.pos
+        result, scanner.pos = _DECODER.raw_decode(text, start)
+        if not ascii_only and not text[start:scanner.pos].isascii():
+            result = json.loads(raw[start:scanner.pos])
+        return result
+
+    scanner.ws()
+    if scanner.peek() != b'{':
+        raise _MalformedJSON(scanner.pos)
+    nb = {}
+    layout = None
+    for key in scanner.members():
+        scanner.ws()
+        if key == 'cells' and scanner.peek() == b'[':
+            array_start = scanner.pos
+            cells, ranges = _decode_cells(text, raw, ascii_only, array_start)
+            scanner.pos = ranges[-1][1] if ranges else array_start + 1
+            scanner.ws()
+            scanner.expect(b']')
+            nb[key] = cells
+            layout = (array_start, scanner.pos, ranges)
+        else:
+            nb[key] = value()
+            if key == 'cells':
+                layout = None
+
+    scanner.ws()
+    if scanner.pos != scanner.end:
+        raise _MalformedJSON(scanner.pos)
+    return nb, layout
+
+
+def _decode_cells(text, raw, ascii_only, array_start):
+    """(cells, ranges) of the array opening at array_start.
+
+    One C scanner call and one separator match per cell; the caller checks
+    the closing ']'.
+    """
+    scan, separator = _DECODER.scan_once, _TEXT_SEPARATOR.match
+    cells, ranges = [], []
+    pos = separator(text, array_start + 1).end()
+    if text.startswith(']', pos):
+        return cells, ranges
+    while True:
+        start = pos
+        try:
+            cell, pos = scan(text, start)
+        except StopIteration:
+            raise _MalformedJSON(start) from None
+        if not ascii_only and not text[start:pos].isascii():
+            cell = json.loads(raw[start:pos])
+        cells.append(cell)
+        ranges.append((start, pos))
+        match = separator(text, pos)
+        if match.group(1) is None:
+            return cells, ranges
+        pos = match.end()
+
+
+def is_payload_heavy(buf):
+    """Estimate from a few evenly spaced windows whether long strings dominate"""
+    step = max(len(buf) // SAMPLE_WINDOWS, 1)
+    sampled = quotes = 0
+    for start in range(0, len(buf), step):
+        window = buf[start:start + SAMPLE_WINDOW_BYTES]
+        sampled += len(window)
+        quotes += window.count(b'"')
+    return sampled >= MIN_BYTES_PER_QUOTE * max(quotes, 1)
+
+
+def read_notebook(notebook_path, cell_fields=(), metadata_fields=(), spans=False,
+                  threshold=STREAMING_THRESHOLD_BYTES):
+    """Load a notebook once for several consumers; returns (nb, spans).
+
+    Large payload-heavy files are streamed into a skeleton (see the module
+    docstring) that additionally decodes `cell_fields` of every cell and
+    the values of `metadata_fields`; everything else is loaded whole.
+
+    With spans=True, payload-heavy files of any size are scanned, and the
+    second value is a CellSpans over the memory-mapped file (the caller
+    closes it), or None if the file has no cells to map, in which case
+    the notebook is loaded whole. Raises json.JSONDecodeError exactly as
+    json.load would.
+    """
+    with open(notebook_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > 0 and (spans or size >= threshold):
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            layout = None
+            try:
+                if is_payload_heavy(buf):
+                    nb, layout = _scan(buf, cell_fields, metadata_fields)
+                elif spans:
+                    nb, layout = _decode(buf)
+                else:
+                    nb = None
+            except (_MalformedJSON, ValueError, RecursionError):
+                nb = None
+            # Spans only with at least one cell: a caller rewriting the file
+            # falls back to dumping the notebook, which must then be complete
+            if spans and layout and layout[2]:
+                return nb, CellSpans(buf, *layout)
+            buf.close()
+            # A skeleton without spans is no use to a caller rewriting the file
+            if nb is not None and not spans:
+                return nb, None
+
+    # Small or malformed: the regular parser (and its error messages)
+    with open(notebook_path, 'r') as f:
+        return json.load(f), None
+
+
+def load_notebook_skeleton(notebook_path, threshold=STREAMING_THRESHOLD_BYTES):
+    """Load the fields the validators need, streaming large files.
+
+    Files smaller than `threshold` bytes, or dominated by many small
+    tokens rather than large payloads, are parsed with json.load and
+    returned whole. Raises json.JSONDecodeError exactly as json.load would.
+    """
+    return read_notebook(notebook_path, threshold=threshold)[0]
@@ -0,0 +1,54 @@
+"""
+Recently modified files for the session briefing (1-session-starter.py).
+
+The briefing lists the few most recently modified files of the current
+scenario directory, which can hold hundreds of thousands of generated
+artifacts. recent_files() walks the tree once with os.scandir, stats
+each file once (the DirEntry caches the result, so the displayed mtime
+needs no second stat) and keeps only the newest `count` with
+heapq.nlargest. Memory stays O(count) and there is no full sort.
+
+iter_files() visits files in os.walk order (a directory's files, then
+its subdirectories depth first, symlinked directories not followed).
+heapq.nlargest breaks ties the same way as a stable
+sort(reverse=True), so equal mtimes resolve as they did before.
+
+There is deliberately no persisted mtime index. Editing a file doesn't
+change its directory's mtime, so an index could only be refreshed
+correctly by stating every file again, which is the walk itself.
+"""
+
+import heapq
+import os
+
+
+def iter_files(top):
+    """DirEntry of every non-directory below top, in os.walk order"""
+    stack = [top]
+    while stack:
+        directory = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        yield entry
+                    elif not entry.is_symlink():
+                        subdirs.append(entry.path)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            continue
+        stack.extend(reversed(subdirs))
+
+
+def recent_files(top, count):
+    """[(path, mtime)] of the `count` most recently modified files below top, newest first.
+
+    Raises OSError for files that can't be stat'ed (e.g. broken symlinks).
+    """
+    stats = ((entry.path, entry.stat().st_mtime) for entry in iter_files(top))
+    return heapq.nlargest(count, stats, key=lambda item: item[1])
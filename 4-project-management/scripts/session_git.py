@@ -0,0 +1,522 @@
+"""
+Git access for the session briefing (1-session-starter.py).
+
+The briefing used to start `git log` for the recent commits and
+`git status` for the workspace state. GitRepository reads what it can
+straight from .git instead:
+
+- HEAD and branch refs (loose ref files and packed-refs),
+- commit objects, loose (zlib) or packed (pack index v2 lookup, with
+  OFS_DELTA/REF_DELTA chains resolved),
+
+so log() and abbreviate() reproduce `git log -n 5 --pretty='%h %s (%cr)'`
+without a subprocess. Objects the reader can't handle (SHA-256
+repositories, alternates, corrupt packs) go through one
+`git cat-file --batch` process, started on first use and reused for the
+rest of the briefing.
+
+status_porcelain() still runs `git status --porcelain`, because only git
+applies .gitignore rules, racy-timestamp checks and the index's cached
+stat data exactly. It runs with the user's own configuration, so an
+untracked cache or fsmonitor set up for the repository is used, but the
+briefing never turns either on by itself.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import subprocess
+import zlib
+from pathlib import Path
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+# git's minimum abbreviation for small repositories
+DEFAULT_ABBREV = 7
+
+
+class GitUnavailable(RuntimeError):
+    """git is missing, the path is not in a repository, or HEAD has no commits"""
+
+
+class Commit:
+    def __init__(self, sha, parents, committer_time, subject):
+        self.sha = sha
+        self.parents = parents
+        self.committer_time = committer_time
+        self.subject = subject
+
+    @classmethod
+    def parse(cls, sha, data):
+        header, _, message = data.partition(b"\n\n")
+        parents = []
+        committer_time = 0
+        encoding = "utf-8"
+        for line in header.split(b"\n"):
+            key, _, value = line.partition(b" ")
+            if key == b"parent":
+                parents.append(value.decode())
+            elif key == b"committer":
+                # "Name <email> 1700000000 +0000"
+                committer_time = int(value.rsplit(b" ", 2)[-2])
+            elif key == b"encoding":
+                encoding = value.decode()
+        return cls(sha, parents, committer_time, _subject(message, encoding))
+
+
+def _subject(message, encoding):
+    """The first paragraph joined into one line, like git's %s"""
+    try:
+        text = message.decode(encoding, errors="replace")
+    except LookupError:
+        text = message.decode("utf-8", errors="replace")
+    lines = []
+    for line in text.lstrip("\n").split("\n"):
+        line = line.rstrip()
+        if not line:
+            break
+        lines.append(line)
+    return " ".join(lines)
+
+
+def relative_date(timestamp, now):
+    """Relative date exactly as git's %cr prints it (date.c show_date_relative)"""
+    def plural(count, unit):
+        return f"{count} {unit}" if count == 1 else f"{count} {unit}s"
+
+    if now < timestamp:
+        return "in the future"
+    diff = int(now - timestamp)
+    if diff < 90:
+        return plural(diff, "second") + " ago"
+    diff = (diff + 30) // 60
+    if diff < 90:
+        return plural(diff, "minute") + " ago"
+    diff = (diff + 30) // 60
+    if diff < 36:
+        return plural(diff, "hour") + " ago"
+    diff = (diff + 12) // 24
+    if diff < 14:
+        return plural(diff, "day") + " ago"
+    if diff < 70:
+        return plural((diff + 3) // 7, "week") + " ago"
+    if diff < 365:
+        return plural((diff + 15) // 30, "month") + " ago"
+    if diff < 1825:
+        total_months = (diff * 12 * 2 + 365) // (365 * 2)
+        years, months = divmod(total_months, 12)
+        if months:
+            return f"{plural(years, 'year')}, {plural(months, 'month')} ago"
+        return plural(years, "year") + " ago"
+    return plural((diff + 183) // 365, "year") + " ago"
+
+
+def _read_config(paths):
+    """{(section, key): value} from git config files, later files winning.
+
+    Only plain `[section]` and `key = value` lines are understood, which
+    covers the core.* and extensions.* settings read here.
+    """
+    config = {}
+    for path in paths:
+        try:
+            text = Path(path).read_text(errors="replace")
+        except OSError:
+            continue
+        section = None
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line.startswith("["):
+                section = line[1:line.find("]")].split()[0].lower() if "]" in line else None
+                continue
+            if section:
+                key, _, value = line.partition("=")
+                config[(section, key.strip().lower())] = value.split("#")[0].split(";")[0].strip() or "true"
+    return config
+
+
+def _find_git_dir(start):
+    path = Path(start).resolve()
+    for directory in (path, *path.parents):
+        candidate = directory / ".git"
+        if candidate.is_dir():
+            return directory, candidate
+        if candidate.is_file():
+            text = candidate.read_text().strip()
+            if text.startswith("gitdir:"):
+                return directory, (directory / text[len("gitdir:"):].strip()).resolve()
+    raise GitUnavailable(f"not a git repository: {path}")
+
+
+class _PackIndex:
+    """Lookups in one pack index (version 2) and its pack, both memory-mapped"""
+
+    def __init__(self, idx_path):
+        self.idx_file = open(idx_path, 'rb')
+        self.idx = mmap.mmap(self.idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.idx[:8] != b"\xfftOc\x00\x00\x00\x02":
+            self.close()
+            raise ValueError(f"unsupported pack index: {idx_path}")
+        self.fanout = struct.unpack_from(">256I", self.idx, 8)
+        self.count = self.fanout[255]
+        self.names = 8 + 1024
+        self.offsets = self.names + 24 * self.count
+        self.large_offsets = self.offsets + 4 * self.count
+        self.pack_file = open(Path(idx_path).with_suffix(".pack"), 'rb')
+        self.pack = mmap.mmap(self.pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        for handle in ("idx", "idx_file", "pack", "pack_file"):
+            if hasattr(self, handle):
+                getattr(self, handle).close()
+
+    def _name(self, position):
+        start = self.names + 20 * position
+        return self.idx[start:start + 20]
+
+    def _bisect(self, name):
+        low = self.fanout[name[0] - 1] if name[0] else 0
+        high = self.fanout[name[0]]
+        while low < high:
+            mid = (low + high) // 2
+            if self._name(mid) < name:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def offset(self, name):
+        """Pack offset of the object, or None"""
+        position = self._bisect(name)
+        if position >= self.count or self._name(position) != name:
+            return None
+        offset = struct.unpack_from(">I", self.idx, self.offsets + 4 * position)[0]
+        if offset & 0x80000000:
+            large = self.large_offsets + 8 * (offset & 0x7fffffff)
+            offset = struct.unpack_from(">Q", self.idx, large)[0]
+        return offset
+
+    def neighbors(self, name):
+        """The names sorting just before and after name (for abbreviation)"""
+        position = self._bisect(name)
+        if position < self.count and self._name(position) == name:
+            candidates = (position - 1, position + 1)
+        else:
+            candidates = (position - 1, position)
+        return [self._name(p) for p in candidates if 0 <= p < self.count]
+
+
+def _inflate(buf, pos, size):
+    decompressor = zlib.decompressobj()
+    chunks = []
+    step = max(size + 64, 4096)
+    while not decompressor.eof:
+        chunk = buf[pos:pos + step]
+        if not chunk:
+            raise ValueError("truncated zlib stream")
+        chunks.append(decompressor.decompress(chunk))
+        pos += step
+    data = b"".join(chunks)
+    if len(data) != size:
+        raise ValueError("object size mismatch")
+    return data
+
+
+def _delta_size(delta, pos):
+    size = shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        size |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def _apply_delta(base, delta):
+    source_size, pos = _delta_size(delta, 0)
+    target_size, pos = _delta_size(delta, pos)
+    if source_size != len(base):
+        raise ValueError("delta base size mismatch")
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise ValueError("invalid delta opcode")
+    if len(out) != target_size:
+        raise ValueError("delta result size mismatch")
+    return bytes(out)
+
+
+class _CatFile:
+    """One `git cat-file --batch` process answering object reads"""
+
+    def __init__(self, work_tree):
+        try:
+            self.process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=work_tree,
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise GitUnavailable("git not found")
+
+    def read(self, sha):
+        self.process.stdin.write(sha.encode() + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise GitUnavailable(f"object {sha} not found")
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)
+        return header[1].decode(), data
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class GitRepository:
+    """Read-only access to the repository containing `path`"""
+
+    def __init__(self, path="."):
+        self.work_tree, self.git_dir = _find_git_dir(path)
+        commondir = self.git_dir / "commondir"
+        self.common_dir = (self.git_dir / commondir.read_text().strip()).resolve() \
+            if commondir.is_file() else self.git_dir
+        self.objects_dir = self.common_dir / "objects"
+
+        home = Path.home()
+        xdg = Path(os.environ.get("XDG_CONFIG_HOME") or home / ".config")
+        self.config = _read_config(["/etc/gitconfig", xdg / "git" / "config",
+                                    home / ".gitconfig", self.common_dir / "config"])
+        # SHA-256 repositories are read through git itself
+        self.native = self.config.get(("extensions", "objectformat"), "sha1") == "sha1"
+
+        self._packs = None
+        self._packed_refs = None
+        self._loose_names = {}
+        self._cat_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for pack in self._packs or []:
+            pack.close()
+        self._packs = []
+        if self._cat_file:
+            self._cat_file.close()
+            self._cat_file = None
+
+    # --- Refs ---------------------------------------------------------------
+
+    def _packed_ref(self, name):
+        if self._packed_refs is None:
+            self._packed_refs = {}
+            try:
+                with open(self.common_dir / "packed-refs", 'r') as f:
+                    for line in f:
+                        if line[0] not in "#^":
+                            sha, _, ref = line.strip().partition(" ")
+                            self._packed_refs[ref] = sha
+            except OSError:
+                pass
+        return self._packed_refs.get(name)
+
+    def resolve(self, name="HEAD"):
+        """Object name a ref points to, or None (unborn branch, missing ref)"""
+        for _ in range(10):
+            base = self.git_dir if name == "HEAD" else self.common_dir
+            try:
+                value = (base / name).read_text().strip()
+            except OSError:
+                return self._packed_ref(name)
+            if not value.startswith("ref:"):
+                return value
+            name = value[len("ref:"):].strip()
+        return None
+
+    # --- Objects ------------------------------------------------------------
+
+    def _pack_indexes(self):
+        if self._packs is None:
+            self._packs = []
+            pack_dir = self.objects_dir / "pack"
+            paths = sorted(pack_dir.glob("*.idx"), key=lambda p: p.stat().st_mtime, reverse=True) \
+                if pack_dir.is_dir() else []
+            for path in paths:
+                try:
+                    self._packs.append(_PackIndex(path))
+                except (OSError, ValueError):
+                    continue
+        return self._packs
+
+    def _read_packed(self, pack, offset):
+        deltas = []
+        while True:
+            buf = pack.pack
+            byte = buf[offset]
+            kind = (byte >> 4) & 7
+            size = byte & 0x0f
+            shift = 4
+            pos = offset + 1
+            while byte & 0x80:
+                byte = buf[pos]
+                pos += 1
+                size |= (byte & 0x7f) << shift
+                shift += 7
+
+            if kind == OFS_DELTA:
+                byte = buf[pos]
+                pos += 1
+                distance = byte & 0x7f
+                while byte & 0x80:
+                    byte = buf[pos]
+                    pos += 1
+                    distance = ((distance + 1) << 7) | (byte & 0x7f)
+                deltas.append(_inflate(buf, pos, size))
+                offset -= distance
+            elif kind == REF_DELTA:
+                base_sha = buf[pos:pos + 20].hex()
+                deltas.append(_inflate(buf, pos + 20, size))
+                kind, data = self.read_object(base_sha)
+                break
+            elif kind in OBJECT_TYPES:
+                kind, data = OBJECT_TYPES[kind], _inflate(buf, pos, size)
+                break
+            else:
+                raise ValueError(f"unknown pack object type {kind}")
+        for delta in reversed(deltas):
+            data = _apply_delta(data, delta)
+        return kind, data
+
+    def _read_native(self, sha):
+        try:
+            raw = zlib.decompress((self.objects_dir / sha[:2] / sha[2:]).read_bytes())
+        except FileNotFoundError:
+            pass
+        else:
+            header, _, data = raw.partition(b"\0")
+            kind, size = header.split()
+            if int(size) != len(data):
+                raise ValueError(f"loose object {sha} is corrupt")
+            return kind.decode(), data
+
+        name = bytes.fromhex(sha)
+        for pack in self._pack_indexes():
+            offset = pack.offset(name)
+            if offset is not None:
+                return self._read_packed(pack, offset)
+        return None
+
+    def read_object(self, sha):
+        """(type, content) of an object, from .git or via git cat-file"""
+        if self.native:
+            try:
+                found = self._read_native(sha)
+                if found:
+                    return found
+            except (OSError, ValueError, IndexError, zlib.error):
+                pass
+        if self._cat_file is None:
+            self._cat_file = _CatFile(self.work_tree)
+        return self._cat_file.read(sha)
+
+    def log(self, count=5):
+        """The first `count` commits `git log` shows from HEAD, newest first"""
+        head = self.resolve("HEAD")
+        if head is None:
+            raise GitUnavailable("HEAD has no commits yet")
+        try:
+            shallow = set((self.common_dir / "shallow").read_text().split())
+        except OSError:
+            shallow = set()
+
+        # git's default walk: a queue ordered by committer date, FIFO on ties
+        commits = []
+        queue = []
+        seen = {head}
+        sequence = 0
+
+        def push(sha):
+            nonlocal sequence
+            kind, data = self.read_object(sha)
+            commit = Commit.parse(sha, data)
+            heapq.heappush(queue, (-commit.committer_time, sequence, commit))
+            sequence += 1
+
+        push(head)
+        while queue and len(commits) < count:
+            commit = heapq.heappop(queue)[2]
+            commits.append(commit)
+            if commit.sha in shallow:
+                continue
+            for parent in commit.parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    push(parent)
+        return commits
+
+    def _abbrev_length(self):
+        value = self.config.get(("core", "abbrev"), "auto").lower()
+        if value in ("no", "false", "off"):
+            return 40
+        if value.isdigit():
+            return min(max(int(value), 4), 40)
+        # "auto": about half the bits of the packed object count, in hex digits
+        count = sum(pack.count for pack in self._pack_indexes())
+        length = (max(count.bit_length() - 1, 0) + 1 + 1) // 2
+        return max(length, DEFAULT_ABBREV)
+
+    def abbreviate(self, sha):
+        """Shortest unambiguous prefix of at least the configured length, like %h"""
+        length = self._abbrev_length()
+        if length >= len(sha) or not self.native:
+            return sha[:length]
+        prefix = sha[:2]
+        if prefix not in self._loose_names:
+            try:
+                self._loose_names[prefix] = [prefix + rest for rest in os.listdir(self.objects_dir / prefix)]
+            except OSError:
+                self._loose_names[prefix] = []
+        others = [name for name in self._loose_names[prefix] if name != sha]
+        for pack in self._pack_indexes():
+            others += [name.hex() for name in pack.neighbors(bytes.fromhex(sha))]
+        for other in others:
+            common = len(os.path.commonprefix([sha, other]))
+            length = max(length, common + 1)
+        return sha[:length]
+
+    # --- Working tree -------------------------------------------------------
+
+    def status_porcelain(self):
+        """`git status --porcelain` output"""
+        try:
+            result = subprocess.run(["git", "status", "--porcelain"], cwd=self.work_tree,
+                                    capture_output=True, text=True, check=True)
+        except FileNotFoundError:
+            raise GitUnavailable("git not found")
+        except subprocess.CalledProcessError as e:
+            raise GitUnavailable(e.stderr.strip() or "git status failed")
+        return result.stdout
@@ -0,0 +1,164 @@
+"""
+Daily-log lookup for the session briefing (1-session-starter.py).
+
+The briefing shows the last lines of the newest log in
+logs-and-debriefs/daily/. Finding it used to stat every log and then
+read the whole file. DailyLogIndex remembers the answer between
+briefings in .cache/session-logs/index.json:
+
+    {"version": 1,
+     "logs": {"/abs/logs-and-debriefs/daily": {
+         "dir_mtime_ns": 1756700000000000000,
+         "latest": "2025-09-01-session-log.md",
+         "stat": [ctime_ns, mtime_ns, size],
+         "tail": [20, 5120]}}}
+
+A briefing stats the directory and the newest log; when both match the
+index, the tail is read from the recorded byte offset in one read. The
+directory is rescanned only when its mtime changes (a log was added,
+removed or renamed, which includes editors that save by rename), and
+the tail is searched again only when the newest log changed. Either way
+the cost does not depend on how many logs there are or how long they
+are. One gap: an older log edited in place, without touching the
+directory, is not noticed as the newest until the directory changes.
+
+tail_lines() finds the tail by reading backward from the end of the
+file in blocks until it has enough lines.
+"""
+
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path(".cache") / "session-logs" / "index.json"
+TAIL_BLOCK_BYTES = 8192
+# Coarse filesystem timestamps: a directory changed this recently may
+# change again within the same tick, so its mtime isn't recorded
+RACY_WINDOW_NS = 2_000_000_000
+
+# Line ends as universal-newline readlines() splits them
+_LINE_BREAK = re.compile(rb'\r\n|\r|\n')
+
+
+def _read_lines(data):
+    """Decode bytes exactly as open(path, 'r').readlines() would"""
+    return io.TextIOWrapper(io.BytesIO(data)).readlines()
+
+
+def tail_lines(path, count, block_size=TAIL_BLOCK_BYTES):
+    """Return (lines, offset): readlines()[-count:] and the byte offset they start at.
+
+    Reads backward from the end in blocks, so only the tail is read.
+    count must be positive.
+    """
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        while True:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            starts = [0] + [m.end() for m in _LINE_BREAK.finditer(data)]
+            if starts[-1] == len(data):
+                starts.pop()
+            # starts[0] is only a real line start at the beginning of the file
+            if pos == 0 or len(starts) > count:
+                start = starts[-count] if len(starts) >= count else 0
+                return _read_lines(data[start:]), pos + start
+
+
+class DailyLogIndex:
+    """Newest daily log and the offset of its tail, kept between briefings"""
+
+    def __init__(self, log_dir, index_path=DEFAULT_INDEX_PATH):
+        self.log_dir = Path(log_dir)
+        self.key = str(self.log_dir.resolve())
+        self.path = Path(index_path)
+        self.logs = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.logs = data.get("logs", {})
+
+    def _scan(self):
+        """Newest *.md log by ctime, as max(glob(...), key=getctime) picks it"""
+        latest = None
+        with os.scandir(self.log_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.endswith('.md'):
+                    continue
+                ctime = entry.stat().st_ctime_ns
+                if latest is None or ctime > latest[1]:
+                    latest = (entry.name, ctime)
+        return latest[0] if latest else None
+
+    def latest(self):
+        """(name, os.stat_result) of the newest log, or None if there are none"""
+        try:
+            dir_mtime = os.stat(self.log_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        entry = self.logs.get(self.key)
+        name = entry["latest"] if entry and entry.get("dir_mtime_ns") == dir_mtime else None
+        if name:
+            try:
+                return name, os.stat(self.log_dir / name)
+            except FileNotFoundError:
+                pass
+
+        name = self._scan()
+        if not entry or entry.get("latest") != name:
+            entry = self.logs[self.key] = {"latest": name}
+        racy = time.time_ns() - dir_mtime < RACY_WINDOW_NS
+        entry["dir_mtime_ns"] = None if racy else dir_mtime
+        self.dirty = True
+        return (name, os.stat(self.log_dir / name)) if name else None
+
+    def tail(self, count):
+        """(name, last `count` lines) of the newest log, or None if there are none"""
+        found = self.latest()
+        if found is None:
+            return None
+        name, st = found
+        entry = self.logs[self.key]
+        stat_key = [st.st_ctime_ns, st.st_mtime_ns, st.st_size]
+        cached = entry.get("tail")
+        if entry.get("stat") == stat_key and cached and cached[0] == count:
+            with open(self.log_dir / name, 'rb') as f:
+                f.seek(cached[1])
+                return name, _read_lines(f.read())
+
+        lines, offset = tail_lines(self.log_dir / name, count)
+        racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+        entry["stat"] = None if racy else stat_key
+        entry["tail"] = [count, offset]
+        self.dirty = True
+        return name, lines
+
+    def save(self):
+        """Write the index atomically; a read-only checkout just goes without it"""
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"version": INDEX_VERSION, "logs": self.logs}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
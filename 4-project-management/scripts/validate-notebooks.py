@@ -7,108 +7,217 @@ rendering on GitHub.
 
 Usage:
     python validate-notebooks.py
+    python validate-notebooks.py --jobs 8 --fail-fast --timings
+    python validate-notebooks.py --no-cache  # ignore .cache/notebook-validation
+    python validate-notebooks.py --staged     # only notebooks staged for commit
+    python validate-notebooks.py --changed origin/main
 """
 
+import argparse
 import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from notebook_cache import ValidationCache, probe
+from notebook_discovery import GitUnavailable, find_changed_notebooks, walk_notebooks
+from notebook_pipeline import ErrorScan, ExecutionAudit, FormatCheck, NotebookModel, NotebookPipeline
+
+# Editing any of these invalidates the validation cache
+VALIDATOR_SOURCES = [Path(__file__), Path(__file__).with_name("notebook_stream.py"),
+                     Path(__file__).with_name("notebook_pipeline.py")]
+
+PIPELINE = NotebookPipeline([FormatCheck(), ExecutionAudit(), ErrorScan()])
+
 
 def validate_notebook(notebook_path):
     """Validate a single notebook."""
-    with open(notebook_path, 'r') as f:
-        try:
-            nb = json.load(f)
-        except json.JSONDecodeError as e:
-            return [f"Invalid JSON: {e}"]
+    issues, _ = validate_notebook_timed(notebook_path)
+    return issues
+
+
+def validate_notebook_timed(notebook_path):
+    """Validate a single notebook, returning (issues, timings in seconds)."""
+    start = time.perf_counter()
+    try:
+        # One load (large notebooks are streamed) and one pass over the cells
+        results, timings = PIPELINE.run(notebook_path)
+    except json.JSONDecodeError as e:
+        return [f"Invalid JSON: {e}"], {"load": time.perf_counter() - start, "checks": 0.0}
     
+    return notebook_issues(results), {"load": timings["load"], "checks": timings["passes"]}
+
+
+def check_notebook(nb):
+    """Run the structural checks on an already loaded notebook."""
+    return notebook_issues(PIPELINE.process(NotebookModel(None, nb)))
+
+
+def notebook_issues(results):
+    """Word the pipeline results as issues."""
     issues = []
+    fmt = results["format"]
     
     # Check notebook format
-    if 'nbformat' not in nb:
+    if not fmt["has_nbformat"]:
         issues.append("Missing nbformat")
-    elif nb['nbformat'] < 4:
-        issues.append(f"Old notebook format: {nb['nbformat']}")
+    elif fmt["nbformat"] < 4:
+        issues.append(f"Old notebook format: {fmt['nbformat']}")
     
     # Check metadata
-    if 'metadata' not in nb:
+    if fmt["metadata_keys"] is None:
         issues.append("Missing metadata")
     else:
-        if 'kernelspec' not in nb['metadata']:
+        if 'kernelspec' not in fmt["metadata_keys"]:
             issues.append("Missing kernelspec")
-        if 'language_info' not in nb['metadata']:
+        if 'language_info' not in fmt["metadata_keys"]:
             issues.append("Missing language_info")
     
     # Check cells
-    if 'cells' not in nb:
+    if not fmt["has_cells"]:
         issues.append("No cells found")
     else:
-        code_cells = [c for c in nb['cells'] if c.get('cell_type') == 'code']
-        
-        # Check for unexecuted cells
-        unexecuted = [i for i, c in enumerate(code_cells) 
-                      if c.get('execution_count') is None]
-        if unexecuted:
-            issues.append(f"{len(unexecuted)} unexecuted code cells")
-        
-        # Check for cells without outputs
-        no_output = [i for i, c in enumerate(code_cells) 
-                     if not c.get('outputs')]
-        if no_output:
-            issues.append(f"{len(no_output)} code cells without outputs")
-        
-        # Check for cells with errors
-        error_cells = []
-        for i, cell in enumerate(code_cells):
-            for output in cell.get('outputs', []):
-                if output.get('output_type') == 'error':
-                    error_cells.append(i)
-                    break
-        if error_cells:
-            issues.append(f"{len(error_cells)} cells with error outputs")
+        execution = results["execution"]
+        if execution["unexecuted"]:
+            issues.append(f"{execution['unexecuted']} unexecuted code cells")
+        if execution["no_output"]:
+            issues.append(f"{execution['no_output']} code cells without outputs")
+        if results["errors"]:
+            issues.append(f"{len(results['errors'])} cells with error outputs")
     
     return issues
 
 
 def find_all_notebooks(root_path="."):
     """Find all notebook files."""
-    root = Path(root_path)
-    # Exclude hidden directories and common build directories
-    notebooks = []
-    for nb in root.glob("**/*.ipynb"):
-        # Skip checkpoint files
-        if ".ipynb_checkpoints" in str(nb):
-            continue
-        notebooks.append(nb)
-    return notebooks
+    # Checkpoints, .git, node_modules and build directories are pruned
+    return walk_notebooks(root_path)
+
+
+def find_notebooks(args):
+    """Pick notebooks per --changed/--staged, falling back to a full walk outside git."""
+    if args.changed or args.staged:
+        try:
+            return find_changed_notebooks(ref=args.changed or "HEAD", staged=args.staged)
+        except GitUnavailable as e:
+            print(f"⚠️  Git unavailable ({e}); validating all notebooks")
+    return find_all_notebooks()
+
+
+def validate_cached_timed(notebook_path, entry):
+    """Probe the cache entry, validating only on a miss: (issues, timings, cache state).
+    
+    Runs in the worker processes, so hashing for the cache is parallel too.
+    """
+    start = time.perf_counter()
+    issues, state = probe(notebook_path, entry)
+    if issues is not None:
+        return issues, {"load": time.perf_counter() - start, "checks": 0.0, "cached": True}, state
+    return (*validate_notebook_timed(notebook_path), state)
+
+
+def iter_results(notebooks, jobs, cache=None):
+    """Yield (path, issues, timings) in input order as results become available.
+    
+    With jobs > 1 notebooks are validated in a process pool; results are
+    still yielded in the original order, each as soon as it and all
+    earlier ones are done. Closing the generator early cancels pending work.
+    Cache entries are checked by the same workers; hits are not parsed and
+    have timings["cached"] set.
+    """
+    def job(notebook_path):
+        """(function, *args) validating one notebook"""
+        if cache:
+            return validate_cached_timed, notebook_path, cache.entry(notebook_path)
+        return validate_notebook_timed, notebook_path
+    
+    def record(notebook_path, issues, timings, state=None):
+        if cache:
+            if timings.get("cached"):
+                cache.record(notebook_path, issues, state)
+            else:
+                cache.record(notebook_path, None, state)
+                cache.store(notebook_path, issues)
+        return notebook_path, issues, timings
+    
+    if jobs <= 1:
+        for notebook_path in notebooks:
+            func, *args = job(notebook_path)
+            yield record(notebook_path, *func(*args))
+        return
+    
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [executor.submit(*job(nb)) for nb in notebooks]
+        for notebook_path, future in zip(notebooks, futures):
+            yield record(notebook_path, *future.result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Validate Jupyter notebooks for GitHub rendering")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Validate in N worker processes (0 = one per CPU core)")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first invalid notebook")
+    parser.add_argument("--timings", action="store_true", help="Show per-notebook load/check timings")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-validate every notebook, ignoring .cache/notebook-validation")
+    parser.add_argument("--changed", nargs="?", const="HEAD", metavar="REF",
+                        help="Only notebooks changed relative to REF (default HEAD), plus untracked ones")
+    parser.add_argument("--staged", action="store_true", help="Only notebooks staged in the git index")
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    
     print("🔍 Validating Jupyter notebooks...")
     print("="*50)
     
-    notebooks = find_all_notebooks()
+    notebooks = find_notebooks(args)
     print(f"Found {len(notebooks)} notebooks\n")
     
     all_valid = True
     results = {}
+    total_timings = {"load": 0.0, "checks": 0.0}
+    started = time.perf_counter()
     
-    for notebook_path in notebooks:
-        issues = validate_notebook(notebook_path)
+    cache = None if args.no_cache else ValidationCache("validate-notebooks", VALIDATOR_SOURCES)
+    stream = iter_results(notebooks, jobs, cache)
+    for notebook_path, issues, timings in stream:
         results[notebook_path] = issues
+        for key in total_timings:
+            total_timings[key] += timings[key]
+        if timings.get("cached"):
+            timing = " (cached)" if args.timings else ""
+        else:
+            timing = (f" ({timings['load'] * 1000:.1f} ms load, {timings['checks'] * 1000:.1f} ms checks)"
+                      if args.timings else "")
         
         if issues:
             all_valid = False
-            print(f"❌ {notebook_path}")
+            print(f"❌ {notebook_path}{timing}")
             for issue in issues:
                 print(f"   - {issue}")
+            if args.fail_fast:
+                stream.close()
+                print("\n⏹️  Stopped at first invalid notebook (--fail-fast)")
+                break
         else:
-            print(f"✅ {notebook_path}")
+            print(f"✅ {notebook_path}{timing}")
+    
+    if cache:
+        cache.save()
     
     # Summary
     print("\n" + "="*50)
     valid_count = sum(1 for issues in results.values() if not issues)
-    print(f"Results: {valid_count}/{len(notebooks)} notebooks valid")
+    print(f"Results: {valid_count}/{len(results)} checked notebooks valid ({len(notebooks)} found)")
+    if args.timings:
+        print(f"Timing: {total_timings['load']:.3f}s load, {total_timings['checks']:.3f}s checks, "
+              f"{time.perf_counter() - started:.3f}s wall with {jobs} job(s)")
+        if cache:
+            print(f"Cache: {cache.summary()}")
     
     if not all_valid:
         print("\n💡 To fix issues, run:")